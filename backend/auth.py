@@ -4,10 +4,11 @@ Pi Monitor - Authentication
 Handles API key authentication and validation
 """
 
-import json
 import os
 import logging
 
+from utils import json_loads
+
 logger = logging.getLogger(__name__)
 
 class AuthManager:
@@ -32,7 +33,7 @@ class AuthManager:
         if not auth_header.startswith('Bearer '):
             return False
         
-        api_key = auth_header.split(' ')[1]
+        api_key = auth_header[7:].strip()
         return api_key == self.api_key
     
     def handle_auth(self, request_handler):
@@ -41,7 +42,7 @@ class AuthManager:
             content_length = int(request_handler.headers.get('Content-Length', 0))
             if content_length > 0:
                 post_data = request_handler.rfile.read(content_length)
-                auth_data = json.loads(post_data.decode('utf-8'))
+                auth_data = json_loads(post_data)
                 api_key = auth_data.get('api_key', '')
                 
                 if api_key == self.api_key:
@@ -63,7 +64,8 @@ class AuthManager:
                     "error": "Missing request body",
                     "message": "API key required"
                 }
-        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        except ValueError as e:
+            # Covers JSONDecodeError from orjson or stdlib json, and UnicodeDecodeError
             logger.error(f"Invalid JSON data in auth request: {e}")
             return {
                 "error": "Invalid JSON data",
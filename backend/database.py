@@ -136,22 +136,7 @@ class MetricsDatabase:
             
             logger.info(f"Database query: minutes={minutes}, cutoff_time={cutoff_time}, limit={limit}")
 
-            # Try to approximate the needed number of points based on stored collection interval
-            try:
-                from database import MetricsDatabase  # local import safe here
-                # We are already inside MetricsDatabase; use self
-                stored_interval = self.get_system_info('collection_interval_seconds')
-                interval_seconds = float(stored_interval) if stored_interval is not None else 5.0
-                if interval_seconds <= 0:
-                    interval_seconds = 5.0
-            except Exception:
-                interval_seconds = 5.0
-
-            estimated_points = int(math.ceil((minutes * 60.0) / interval_seconds))
-            # Add a small buffer and cap
-            desired_points = min(estimated_points + 50, 50000)
-            # Ensure we request at least the caller-provided limit
-            effective_limit = max(int(limit), desired_points)
+            effective_limit, interval_seconds = self._history_limit(minutes, limit)
             
             with self._connect() as conn:
                 cursor = conn.cursor()
@@ -203,6 +188,72 @@ class MetricsDatabase:
             logger.error(f"Failed to get metrics history: {e}")
             return []
     
+    def _history_limit(self, minutes, limit):
+        """Return (row limit, collection interval) needed to cover the last N minutes"""
+        # Try to approximate the needed number of points based on stored collection interval
+        try:
+            stored_interval = self.get_system_info('collection_interval_seconds')
+            interval_seconds = float(stored_interval) if stored_interval is not None else 5.0
+            if interval_seconds <= 0:
+                interval_seconds = 5.0
+        except Exception:
+            interval_seconds = 5.0
+
+        estimated_points = int(math.ceil((minutes * 60.0) / interval_seconds))
+        # Add a small buffer and cap
+        desired_points = min(estimated_points + 50, 50000)
+        # Ensure we request at least the caller-provided limit
+        return max(int(limit), desired_points), interval_seconds
+    
+    def get_metrics_history_json(self, minutes=60, include_date=True, limit=1000):
+        """Get metrics history as a JSON array encoded by SQLite.
+
+        Rows have the same shape as get_metrics_history() plus 'formatted_time',
+        but are never materialized as Python dicts. Returns (count, json_bytes),
+        or None when there are no rows or the query fails.
+        """
+        try:
+            cutoff_time = time.time() - (minutes * 60)
+            effective_limit, _ = self._history_limit(minutes, limit)
+            time_format = '%Y-%m-%d %H:%M:%S' if include_date else '%H:%M:%S'
+            
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                
+                # Newest rows within the window, aggregated in ascending order for the frontend
+                cursor.execute('''
+                    SELECT COUNT(*), json_group_array(json_object(
+                        -- %!.17g keeps full float precision for the epoch timestamp
+                        'timestamp', json(printf('%!.17g', timestamp)), 'cpu_percent', cpu_percent,
+                        'memory_percent', memory_percent, 'disk_percent', disk_percent,
+                        'temperature', temperature, 'voltage', voltage, 'core_current', core_current,
+                        'network', json_object(
+                            'bytes_sent', network_bytes_sent, 'bytes_recv', network_bytes_recv,
+                            'packets_sent', network_packets_sent, 'packets_recv', network_packets_recv),
+                        'disk_io', json_object(
+                            'read_bytes', disk_read_bytes, 'write_bytes', disk_write_bytes,
+                            'read_count', disk_read_count, 'write_count', disk_write_count),
+                        'formatted_time', strftime(?, timestamp, 'unixepoch', 'localtime')
+                    ))
+                    FROM (
+                        SELECT * FROM (
+                            SELECT * FROM metrics
+                            WHERE timestamp > ?
+                            ORDER BY timestamp DESC
+                            LIMIT ?
+                        ) ORDER BY timestamp ASC
+                    )
+                ''', (time_format, cutoff_time, effective_limit))
+                
+                count, metrics_json = cursor.fetchone()
+                if not count:
+                    return None
+                return count, metrics_json.encode('utf-8')
+                
+        except Exception as e:
+            logger.error(f"Failed to get metrics history JSON: {e}")
+            return None
+    
     def get_metrics_range(self, start_ts, end_ts, limit=None, offset=None):
         """Get metrics between start_ts and end_ts (inclusive start, exclusive end)."""
         try:
@@ -296,8 +347,13 @@ class MetricsDatabase:
             logger.error(f"Failed to get latest metrics: {e}")
             return []
     
-    def cleanup_old_data(self, days_to_keep=None):
-        """Clean up old metrics data to prevent database bloat"""
+    def cleanup_old_data(self, days_to_keep=None, batch_size=4000, max_batches_per_run=50, pause=0.05):
+        """Clean up old metrics data to prevent database bloat.
+        
+        Rows are deleted in small committed batches with a short pause between
+        them, so readers and the metrics writer are never blocked for long.
+        At most batch_size * max_batches_per_run rows are removed per call.
+        """
         try:
             # Use stored retention setting if days_to_keep is not provided
             if days_to_keep is None:
@@ -305,14 +361,24 @@ class MetricsDatabase:
                 days_to_keep = retention_hours / 24.0
             
             cutoff_time = time.time() - (days_to_keep * 24 * 60 * 60)
+            deleted_count = 0
             
             with self._connect() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute('DELETE FROM metrics WHERE timestamp < ?', (cutoff_time,))
-                deleted_count = cursor.rowcount
+                for batch in range(max_batches_per_run):
+                    if batch:
+                        time.sleep(pause)
+                    cursor.execute(
+                        'DELETE FROM metrics WHERE rowid IN '
+                        '(SELECT rowid FROM metrics WHERE timestamp < ? LIMIT ?)',
+                        (cutoff_time, batch_size)
+                    )
+                    conn.commit()
+                    deleted_count += cursor.rowcount
+                    if cursor.rowcount < batch_size:
+                        break
                 
-                conn.commit()
                 logger.info(f"Cleaned up {deleted_count} old metrics records (keeping last {days_to_keep:.1f} days)")
                 return deleted_count
                 
@@ -11,6 +11,37 @@ import shutil
 
 logger = logging.getLogger(__name__)
 
+# Curated list of important logs to surface, in display priority order
+_IMPORTANT_LOG_NAMES = (
+    'pi_monitor.log',
+    'syslog',
+    'auth.log',
+    'kern.log',
+    'daemon.log',
+    'messages',
+    'boot.log',
+    'dmesg',
+)
+_IMPORTANT_LOG_NAME_SET = frozenset(_IMPORTANT_LOG_NAMES)
+_IMPORTANT_LOG_PREFIXES = (
+    'syslog',  # capture syslog without rotations
+)
+_LOG_PRIORITY = {name: idx for idx, name in enumerate(_IMPORTANT_LOG_NAMES)}
+
+
+def _is_important_log(filename):
+    """Whether a file in a log directory belongs in the curated logs list"""
+    # Exclude rotated and compressed logs to keep the list clean
+    if filename.endswith('.gz'):
+        return False
+    # Exclude numeric rotations like syslog.1, auth.log.1, etc.
+    parts = filename.rsplit('.', 1)
+    if len(parts) == 2 and parts[1].isdigit():
+        return False
+    # Match curated exact names, then curated prefixes (e.g., syslog)
+    return filename in _IMPORTANT_LOG_NAME_SET or filename.startswith(_IMPORTANT_LOG_PREFIXES)
+
+
 class LogManager:
     """Manages log file operations"""
     
@@ -20,44 +51,16 @@ class LogManager:
     def get_logs_list(self):
         """Return a list of available log files"""
         results = []
-        
-        # Curated list of important logs to surface
-        important_exact_names = {
-            'pi_monitor.log',
-            'syslog',
-            'auth.log',
-            'kern.log',
-            'daemon.log',
-            'messages',
-            'boot.log',
-            'dmesg',
-        }
-        important_prefixes = (
-            'syslog',  # capture syslog without rotations
-        )
-        
-        def is_important_log(filename: str) -> bool:
-            # Exclude rotated and compressed logs to keep the list clean
-            if filename.endswith('.gz'):
-                return False
-            # Exclude numeric rotations like syslog.1, auth.log.1, etc.
-            parts = filename.rsplit('.', 1)
-            if len(parts) == 2 and parts[1].isdigit():
-                return False
-            # Match curated exact names
-            if filename in important_exact_names:
-                return True
-            # Match curated prefixes (e.g., syslog)
-            if any(filename.startswith(prefix) for prefix in important_prefixes):
-                return True
-            return False
+        seen = set()
         
         for base in ['/var/log', './logs', 'logs']:
             try:
                 if os.path.isdir(base):
                     for name in os.listdir(base):
-                        if not is_important_log(name):
+                        # Deduplicate by name (first directory wins) before paying for a stat
+                        if name in seen or not _is_important_log(name):
                             continue
+                        seen.add(name)
                         full = os.path.join(base, name)
                         try:
                             size_bytes = os.path.getsize(full)
@@ -68,7 +71,7 @@ class LogManager:
                 continue
         
         # Include backend log if present (ensures it appears even if not under the scanned dirs)
-        if os.path.exists('pi_monitor.log'):
+        if 'pi_monitor.log' not in seen and os.path.exists('pi_monitor.log'):
             try:
                 size_bytes = os.path.getsize('pi_monitor.log')
             except Exception:
@@ -76,22 +79,11 @@ class LogManager:
             results.append({'name': 'pi_monitor.log', 'path': '.', 'size': size_bytes})
         
         # Include systemd journal as a pseudo-log if journalctl is available
-        if shutil.which('journalctl') is not None:
+        if 'journal' not in seen and shutil.which('journalctl') is not None:
             results.append({'name': 'journal', 'path': '[system]', 'size': 0})
         
-        # Deduplicate by name (prefer shorter path like current dir)
-        deduped = {}
-        for entry in results:
-            name = entry.get('name')
-            if name not in deduped:
-                deduped[name] = entry
-        results = list(deduped.values())
-        
         # Sort by priority
-        priority = {name: idx for idx, name in enumerate([
-            'pi_monitor.log', 'syslog', 'auth.log', 'kern.log', 'daemon.log', 'messages', 'boot.log', 'dmesg'
-        ])}
-        results.sort(key=lambda r: priority.get(r.get('name'), 999))
+        results.sort(key=lambda r: _LOG_PRIORITY.get(r['name'], 999))
         
         return results
     
@@ -111,38 +103,15 @@ class LogManager:
             
             # Read last N lines efficiently
             content = self._tail_file(log_file, lines)
-            entries = []
-            error_count = 0
-            warn_count = 0
-            
-            for line in content.splitlines():
-                level = 'info'
-                low = line.lower()
-                if 'error' in low or ' err ' in low:
-                    level = 'error'
-                    error_count += 1
-                elif 'warn' in low:
-                    level = 'warning'
-                    warn_count += 1
-                
-                entries.append({
-                    'level': level,
-                    'message': line,
-                })
+            response = self._format_plain_text_entries(log_name, content.splitlines())
             
             try:
                 size_bytes = os.path.getsize(log_file)
             except Exception:
                 size_bytes = 0
             
-            return {
-                'name': log_name,
-                'entries': entries,
-                'totalEntries': len(entries),
-                'errorCount': error_count,
-                'warningCount': warn_count,
-                'size': size_bytes
-            }
+            response['size'] = size_bytes
+            return response
             
         except Exception as e:
             return {'error': str(e)}
@@ -216,20 +185,18 @@ class LogManager:
         request_handler.send_header('Content-Length', str(file_size))
         request_handler._set_common_headers()
         
-        # Stream file in chunks
-        chunk_size = 8192
+        # Hand the file to the kernel (os.sendfile where available); capped at the
+        # advertised length in case the log grows while it is being sent
         with open(log_file, 'rb') as f:
-            while True:
-                chunk = f.read(chunk_size)
-                if not chunk:
-                    break
-                request_handler.wfile.write(chunk)
+            request_handler.connection.sendfile(f, 0, file_size)
     
     def _stream_command_output(self, request_handler, command, filename):
         """Stream command output as a downloadable file"""
         request_handler.send_response(200)
         request_handler.send_header('Content-type', 'text/plain')
         request_handler.send_header('Content-Disposition', f'attachment; filename="{filename}"')
+        # Length is unknown up front, so end the response by closing the connection
+        request_handler.send_header('Connection', 'close')
         request_handler._set_common_headers()
         try:
             with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=False) as proc:
@@ -264,7 +231,7 @@ class LogManager:
         except Exception as e:
             logger.error(f"Failed to read journal: {e}")
             content = ''
-        return self._format_plain_text_entries('journal', content)
+        return self._format_plain_text_entries('journal', content.splitlines())
 
     def _read_dmesg(self, num_lines):
         """Read last N lines from dmesg output if file not present"""
@@ -274,17 +241,18 @@ class LogManager:
             result = subprocess.run(['dmesg'], capture_output=True, text=True, timeout=5)
             output = result.stdout if result.returncode == 0 else ''
             # Take last N lines ourselves
-            content = '\n'.join(output.splitlines()[-num_lines:])
+            lines = output.splitlines()[-num_lines:]
         except Exception as e:
             logger.error(f"Failed to read dmesg: {e}")
-            content = ''
-        return self._format_plain_text_entries('dmesg', content)
+            lines = []
+        return self._format_plain_text_entries('dmesg', lines)
 
-    def _format_plain_text_entries(self, log_name, content):
+    def _format_plain_text_entries(self, log_name, lines):
+        """Classify log lines by level, counting errors and warnings in the same pass"""
         entries = []
         error_count = 0
         warn_count = 0
-        for line in content.splitlines():
+        for line in lines:
             level = 'info'
             low = line.lower()
             if 'error' in low or ' err ' in low:
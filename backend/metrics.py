@@ -11,6 +11,15 @@ from collections import deque
 from functools import lru_cache
 import os # Added missing import for os
 
+from utils import (
+    json_dumps,
+    VCGENCMD_TEMP_RE as _TEMP_RE,
+    VCGENCMD_CORE_VOLT_RE as _CORE_VOLT_RE,
+    VCGENCMD_CORE_CURRENT_RE as _CORE_CURRENT_RE,
+    VCGENCMD_VOLT_RE as _VOLT_RE,
+    VCGENCMD_OVER_VOLTAGE_RE as _OVER_VOLTAGE_RE,
+)
+
 # Handle psutil import gracefully
 try:
     import psutil
@@ -66,6 +75,19 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Shared MetricsDatabase, built on first use instead of once per call
+_shared_db = None
+
+
+def _get_database():
+    """Return the module's shared MetricsDatabase instance"""
+    global _shared_db
+    if _shared_db is None:
+        from database import MetricsDatabase
+        _shared_db = MetricsDatabase()
+    return _shared_db
+
+
 class MetricsCollector:
     """Collects and manages system metrics"""
     
@@ -73,6 +95,8 @@ class MetricsCollector:
         self.collection_interval = 5.0  # Default 5 seconds
         self.is_collecting = False
         self.collection_thread = None
+        # Set by stop_collection() to wake the collector thread immediately
+        self._stop_event = threading.Event()
         self.last_collection = 0
         self.collection_lock = threading.Lock()
         
@@ -90,8 +114,7 @@ class MetricsCollector:
         self.metrics_history = self.recent_cache
         # Try loading persisted interval from database
         try:
-            from database import MetricsDatabase
-            db = MetricsDatabase()
+            db = _get_database()
             saved = db.get_system_info('collection_interval_seconds')
             if saved is not None:
                 try:
@@ -118,8 +141,7 @@ class MetricsCollector:
                 logger.info(f"Metrics collection interval updated to {new_interval} seconds")
             # Persist to database
             try:
-                from database import MetricsDatabase
-                db = MetricsDatabase()
+                db = _get_database()
                 db.store_system_info('collection_interval_seconds', str(new_interval))
             except Exception as e:
                 logger.warning(f"Failed to persist collection interval: {e}")
@@ -136,6 +158,7 @@ class MetricsCollector:
         """Start background metrics collection"""
         if not self.is_collecting:
             self.is_collecting = True
+            self._stop_event.clear()
             self.collection_thread = threading.Thread(target=self._collect_metrics, daemon=True)
             self.collection_thread.start()
             logger.info("Metrics collection started")
@@ -143,19 +166,21 @@ class MetricsCollector:
     def stop_collection(self):
         """Stop background metrics collection"""
         self.is_collecting = False
+        self._stop_event.set()
         if self.collection_thread:
-            self.collection_thread.join(timeout=1)
+            # Let an in-flight database insert finish rather than abandoning it
+            self.collection_thread.join(timeout=5)
             logger.info("Metrics collection stopped")
     
     def _collect_metrics(self):
         """Background thread for collecting metrics"""
-        while self.is_collecting:
+        while not self._stop_event.is_set():
             try:
                 start_time = time.time()
                 
                 # Check if enough time has passed since last collection
                 if start_time - self.last_collection < self.collection_interval:
-                    time.sleep(0.1)
+                    self._stop_event.wait(0.1)
                     continue
                 
                 metrics = self._gather_current_metrics()
@@ -164,8 +189,7 @@ class MetricsCollector:
                         # Keep in memory cache for quick access
                         self.recent_cache.append(metrics)
                         # Store in database for persistence
-                        from database import MetricsDatabase
-                        db = MetricsDatabase()
+                        db = _get_database()
                         if db.insert_metrics(metrics):
                             self.collection_count += 1
                         else:
@@ -182,7 +206,7 @@ class MetricsCollector:
                 self.last_error = str(e)
                 logger.error(f"Error collecting metrics: {e}")
             
-            time.sleep(0.1)  # Reduced sleep for more responsive collection
+            self._stop_event.wait(0.1)  # Reduced sleep for more responsive collection
     
     def _gather_current_metrics(self):
         """Gather current system metrics"""
@@ -247,8 +271,7 @@ class MetricsCollector:
                 import subprocess
                 result = subprocess.run(['vcgencmd', 'measure_temp'], capture_output=True, text=True, timeout=5)
                 if result.returncode == 0:
-                    import re
-                    temp_match = re.search(r'temp=(\d+\.?\d*)', result.stdout)
+                    temp_match = _TEMP_RE.search(result.stdout)
                     if temp_match:
                         temp_value = float(temp_match.group(1))
                         if temp_value > 0 and temp_value < 200:  # Sanity check
@@ -276,15 +299,14 @@ class MetricsCollector:
                 import subprocess
                 result = subprocess.run(['vcgencmd', 'pmic_read_adc'], capture_output=True, text=True, timeout=5)
                 if result.returncode == 0:
-                    import re
                     # VDD_CORE_V voltage
-                    voltage_match = re.search(r'VDD_CORE_V volt\(15\)=(\d+\.?\d*)V', result.stdout)
+                    voltage_match = _CORE_VOLT_RE.search(result.stdout)
                     if voltage_match:
                         v = float(voltage_match.group(1))
                         if 0 < v < 2.0:
                             voltage_value = round(v, 3)
                     # VDD_CORE_A current
-                    current_match = re.search(r'VDD_CORE_A current\(7\)=(\d+\.?\d*)A', result.stdout)
+                    current_match = _CORE_CURRENT_RE.search(result.stdout)
                     if current_match:
                         a = float(current_match.group(1))
                         if 0 <= a < 10:
@@ -298,8 +320,7 @@ class MetricsCollector:
                     import subprocess
                     result = subprocess.run(['vcgencmd', 'measure_volts', 'core'], capture_output=True, text=True, timeout=5)
                     if result.returncode == 0:
-                        import re
-                        voltage_match = re.search(r'volt=(\d+\.?\d*)', result.stdout)
+                        voltage_match = _VOLT_RE.search(result.stdout)
                         if voltage_match:
                             v = float(voltage_match.group(1))
                             if 0 < v < 2.0:
@@ -313,8 +334,7 @@ class MetricsCollector:
                     import subprocess
                     result = subprocess.run(['vcgencmd', 'get_config', 'int'], capture_output=True, text=True, timeout=5)
                     if result.returncode == 0:
-                        import re
-                        ov_match = re.search(r'over_voltage=(\d+)', result.stdout)
+                        ov_match = _OVER_VOLTAGE_RE.search(result.stdout)
                         if ov_match:
                             overvoltage = int(ov_match.group(1))
                             base_voltage = 0.7
@@ -337,8 +357,7 @@ class MetricsCollector:
         """Get metrics history for the last N minutes"""
         try:
             # Try to get from database first
-            from database import MetricsDatabase
-            db = MetricsDatabase()
+            db = _get_database()
             db_metrics = db.get_metrics_history(minutes)
             if db_metrics:
                 logger.info(f"Retrieved {len(db_metrics)} metrics from database")
@@ -375,12 +394,29 @@ class MetricsCollector:
             enhanced_metric = {**metric, 'formatted_time': formatted_time}
             enhanced_metrics.append(enhanced_metric)
         
-        response = {
-            'metrics': enhanced_metrics,
+        response = {'metrics': enhanced_metrics}
+        response.update(self._history_info(len(enhanced_metrics), include_date))
+        
+        return response
+    
+    def get_metrics_history_formatted_json(self, database, minutes=60, include_date=True):
+        """Encoded equivalent of get_metrics_history_formatted, with rows serialized by SQLite"""
+        result = database.get_metrics_history_json(minutes, include_date)
+        if result is None:
+            # Nothing in the database (or query failed): use the memory-cache path
+            return json_dumps(self.get_metrics_history_formatted(minutes, include_date))
+        
+        count, metrics_json = result
+        # Splice the pre-encoded array in front of the remaining envelope fields
+        return b'{"metrics":' + metrics_json + b',' + json_dumps(self._history_info(count, include_date))[1:]
+    
+    def _history_info(self, total_points, include_date):
+        """Collection/database metadata that accompanies a metrics history response"""
+        return {
             'collection_status': {
                 'active': self.is_collecting,
                 'interval': int(self.collection_interval),
-                'total_points': len(enhanced_metrics)
+                'total_points': total_points
             },
             'database_info': {
                 'source': 'database',
@@ -389,8 +425,6 @@ class MetricsCollector:
                 'formatted': include_date
             }
         }
-        
-        return response
     
     def get_latest_metrics(self):
         """Get the most recent metrics"""
@@ -400,8 +434,7 @@ class MetricsCollector:
                 return self.recent_cache[-1]
             
             # Fallback to database
-            from database import MetricsDatabase
-            db = MetricsDatabase()
+            db = _get_database()
             db_metrics = db.get_metrics_history(1, 1)  # Last 1 minute, 1 record
             return db_metrics[0] if db_metrics else None
         except Exception as e:
@@ -423,8 +456,7 @@ class MetricsCollector:
     def get_stats(self):
         """Get collection statistics"""
         try:
-            from database import MetricsDatabase
-            db = MetricsDatabase()
+            db = _get_database()
             db_stats = db.get_database_stats()
         except Exception as e:
             logger.error(f"Failed to get database stats: {e}")
@@ -4,13 +4,14 @@ Pi Monitor - Power Management
 Handles system power operations like shutdown, restart, and sleep
 """
 
-import json
 import os
 import platform
 import subprocess
 import time
 import logging
 
+from utils import json_loads
+
 logger = logging.getLogger(__name__)
 
 class PowerManager:
@@ -59,7 +60,7 @@ class PowerManager:
             content_length = int(request_handler.headers.get('Content-Length', 0))
             if content_length > 0:
                 post_data = request_handler.rfile.read(content_length)
-                data = json.loads(post_data.decode('utf-8'))
+                data = json_loads(post_data)
                 
                 action = data.get('action', '')
                 delay = data.get('delay', 0)
@@ -4,11 +4,14 @@ Pi Monitor - HTTP Server
 Main server class that handles HTTP requests and routing
 """
 
-import json
+import gzip
+import sys
 import time
+import queue
+import hashlib
 import threading
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from socketserver import ThreadingMixIn
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer as _ThreadingHTTPServer
 import os
 from urllib.parse import urlparse, parse_qs
 
@@ -17,21 +20,244 @@ from auth import AuthManager
 from metrics import MetricsCollector
 from database import MetricsDatabase
 from system_monitor import SystemMonitor
-from service_manager import ServiceManager
+from service_manager import ServiceManager, RESTART_INFO_JSON, MANAGE_INFO_JSON
 from power_manager import PowerManager
 from log_manager import LogManager
-from utils import rate_limit, monitor_performance
+from utils import rate_limit, monitor_performance, require_auth, ResponseCache, json_dumps as _dumps, json_loads as _loads
+
+# JSON bodies at least this large are gzip-compressed for clients that accept it
+_GZIP_MIN_SIZE = 1024
+_GZIP_LEVEL = 1
+
+# Per-thread scratch buffer used to assemble small responses into a single write
+_tls = threading.local()
+_RESPONSE_BUFFER_SIZE = 4096
+_RESPONSE_BUFFER_MAX = 64 * 1024
+
+# Static CORS header block shared by every response
+_CORS_HEADERS = (
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+    b"Access-Control-Allow-Headers: Content-Type, Authorization\r\n"
+    # Expose custom headers so frontend can read versioning
+    b"Access-Control-Expose-Headers: X-PiMonitor-Name, X-PiMonitor-Version, X-PiMonitor-Service\r\n"
+)
+
+# Complete CORS preflight response; browsers cache it for a day via Max-Age
+_PREFLIGHT_RESPONSE = (
+    b"HTTP/1.1 204 No Content\r\n"
+    + _CORS_HEADERS
+    + b"Access-Control-Max-Age: 86400\r\n"
+    b"\r\n"
+)
+# Static error bodies, encoded once instead of per failed request
+_UNAUTHORIZED_BODY = b'{"error":"Unauthorized"}'
+_NOT_FOUND_BODY = b'{"error":"Not found"}'
+_WEBAUTHN_UNAVAILABLE_BODY = b'{"error":"WebAuthn not available"}'
+_PAYLOAD_TOO_LARGE_BODY = b'{"error":"Request body too large"}'
+
+# Largest POST body accepted; bigger requests get 413 without the body being read
+_MAX_POST_BODY = 64 * 1024
+_MISSING_REQUEST_BODY = b'{"error":"Missing request body"}'
+# Pre-encoded 500 prefixes for the auth handlers (_send_internal_error_exc appends the exception text)
+_ERR_REGISTER_BEGIN = b'{"error":"Registration initiation failed: '
+_ERR_REGISTER_COMPLETE = b'{"error":"Registration completion failed: '
+_ERR_AUTHENTICATE_BEGIN = b'{"error":"Authentication initiation failed: '
+_ERR_AUTHENTICATE_COMPLETE = b'{"error":"Authentication completion failed: '
+_ERR_LOGOUT = b'{"error":"Logout failed: '
+_ERR_USER_INFO = b'{"error":"Get user info failed: '
+# 500 prefix for cached GET endpoints whose builder failed with nothing cached to fall back on
+_ERR_BUILD_RESPONSE = b'{"error":"Failed to build response: '
+# Fixed success envelope for /api/auth/user; only the user object is serialized per request
+_USER_INFO_PREFIX = b'{"success":true,"user":'
+
+# /api/service/<endpoint> dispatch, keyed by the last path segment; GET entries
+# return the encoded body (restart/manage info is static and pre-encoded)
+_SERVICE_GET_ENDPOINTS = {
+    'restart': lambda manager, handler: RESTART_INFO_JSON,
+    'manage': lambda manager, handler: MANAGE_INFO_JSON,
+    'info': lambda manager, handler: _dumps(manager.get_service_info()),
+}
+_ERR_UNKNOWN_SERVICE_ENDPOINT = b'{"error":"Unknown service endpoint"}'
+_SERVICE_POST_ENDPOINTS = {
+    'restart': lambda manager, handler: manager.restart_service(),
+    'manage': lambda manager, handler: manager.manage_service(handler),
+    'info': lambda manager, handler: manager.get_service_info(),
+}
+
+# Exact-match GET routes; each entry is called with (handler, query_params)
+_GET_ROUTES = {
+    '/health': lambda handler, query: handler._handle_health_check(),
+    '/api/version': lambda handler, query: handler._handle_version(),
+    '/api/auth/user': lambda handler, query: handler._handle_get_user_info(),
+    '/api/auth/status': lambda handler, query: handler._handle_auth_status(),
+    '/api/system': lambda handler, query: handler._handle_system_stats(query),
+    '/api/system/enhanced': lambda handler, query: handler._handle_enhanced_system_stats(),
+    '/api/system/info': lambda handler, query: handler._handle_system_info_detail(),
+    '/api/services': lambda handler, query: handler._handle_services_list(),
+    '/api/network': lambda handler, query: handler._handle_network_info(),
+    '/api/network/stats': lambda handler, query: handler._handle_network_stats(),
+    '/api/logs': lambda handler, query: handler._handle_logs_list(query),
+    '/api/metrics/database': lambda handler, query: handler._handle_database_stats(),
+    '/api/metrics/export': lambda handler, query: handler._handle_metrics_export(),
+    '/api/metrics/interval': lambda handler, query: handler._handle_metrics_interval(query),
+    '/api/metrics/retention': lambda handler, query: handler._handle_metrics_retention(query),
+    '/api/metrics': lambda handler, query: handler._handle_metrics_summary(),
+    '/api/test': lambda handler, query: handler._handle_test_endpoint(),
+    '/api/refresh': lambda handler, query: handler._handle_refresh(),
+    '/api/power': lambda handler, query: handler._handle_power_status_get(),
+}
+
+# Prefix GET routes, tried in order after an exact-match miss; called with
+# (handler, path, query_params) and may return False to pass on the request
+_GET_PREFIX_ROUTES = (
+    ('/api/logs/', lambda handler, path, query: handler._route_log_get(path, query)),
+    ('/api/metrics/history', lambda handler, path, query: handler._handle_metrics_history(query)),
+    ('/api/metrics/range', lambda handler, path, query: handler._handle_metrics_range(query)),
+    ('/api/service/', lambda handler, path, query: handler._handle_service_endpoints(path)),
+)
+
+# Exact-match POST routes; each entry is called with (handler, parsed_url)
+_POST_ROUTES = {
+    '/api/auth/token': lambda handler, url: handler._handle_auth(),
+    '/api/auth/webauthn/register/begin': lambda handler, url: handler._handle_webauthn_register_begin(),
+    '/api/auth/webauthn/register/complete': lambda handler, url: handler._handle_webauthn_register_complete(),
+    '/api/auth/webauthn/authenticate/begin': lambda handler, url: handler._handle_webauthn_authenticate_begin(),
+    '/api/auth/webauthn/authenticate/complete': lambda handler, url: handler._handle_webauthn_authenticate_complete(),
+    '/api/auth/logout': lambda handler, url: handler._handle_logout(),
+    '/api/services': lambda handler, url: handler._handle_services_post(),
+    '/api/power': lambda handler, url: handler._handle_power_action(),
+    '/api/power/shutdown': lambda handler, url: handler._handle_power_shutdown(),
+    '/api/power/restart': lambda handler, url: handler._handle_power_restart(),
+    '/api/power/sleep': lambda handler, url: handler._handle_power_sleep(),
+    '/api/metrics/clear': lambda handler, url: handler._handle_metrics_clear(),
+    '/api/metrics/interval': lambda handler, url: handler._handle_metrics_interval(parse_qs(url.query)),
+    '/api/metrics/retention': lambda handler, url: handler._handle_metrics_retention(parse_qs(url.query)),
+}
+
+# Verified JWT claims are reused for at most this many seconds (or until exp)
+_JWT_CACHE_MAX = 1024
+_JWT_CACHE_TTL = 60
+_time = time.time
+# Encoded /api/auth/status body is reused for this many seconds
+_AUTH_STATUS_TTL = 1.0
+
+# Access log lines queued by request threads and written in batches by one writer thread
+_access_log = queue.SimpleQueue()
+
+# Seconds an encoded GET response is reused, per endpoint
+_CACHE_TTL_LIVE = 2  # /api/system, /api/system/enhanced, /api/network/stats
+_CACHE_TTL_SERVICES = 10  # /api/services
+_CACHE_TTL_STATIC = 30  # /api/system/info, /api/network
+_CACHE_TTL_DATABASE = 60  # /api/metrics/database
+# Marks a cached body served after its rebuild failed (RFC 7234 warn-code 110)
+_STALE_WARNING = b'Warning: 110 - "Response is Stale"\r\n'
 
 # WebAuthn imports
 try:
-    from webauthn_manager import WebAuthnManager
+    from webauthn_manager import WebAuthnManager, RequestInfo
     WEBAUTHN_ENABLED = True
 except ImportError:
     WEBAUTHN_ENABLED = False
     WebAuthnManager = None
+    RequestInfo = None
+
+
+def _build_common_headers():
+    """Pre-encode the JSON, CORS, versioning and cache headers sent with every API response"""
+    name = config.get('project.name', 'Pi Monitor')
+    version = config.get('project.version', '1.0.0')
+    versioning = (
+        f"X-PiMonitor-Name: {name}\r\n"
+        f"X-PiMonitor-Version: {version}\r\n"
+        "X-PiMonitor-Service: backend\r\n"
+    ).encode('latin-1', 'strict')
+    return (
+        b"Content-type: application/json\r\n"
+        + _CORS_HEADERS
+        + versioning
+        + b"Cache-Control: no-cache, no-store, must-revalidate\r\n"
+        b"Pragma: no-cache\r\n"
+        b"Expires: 0\r\n"
+        b"Vary: Accept-Encoding\r\n"
+    )
+
+
+def _build_server_signature():
+    """Resolve the Server header value from the project name and version"""
+    try:
+        name = config.get('project.name', 'Pi Monitor')
+        version = config.get('project.version', '1.0.0')
+        return f"{name}/{version}"
+    except Exception:
+        return "PiMonitor"
+
+
+def _build_response_heads(common_headers, protocol_version):
+    """Pre-encode the status line plus common headers for each JSON status code the API sends"""
+    heads = {}
+    for code in (200, 400, 401, 404, 413, 429, 500, 503):
+        phrase = BaseHTTPRequestHandler.responses[code][0]
+        heads[code] = f"{protocol_version} {code} {phrase}\r\n".encode('latin-1') + common_headers
+    return heads
+
+
+def _build_body_templates(started_at):
+    """Pre-encode the constant parts of the /health and /api/version bodies.
+
+    Returns (health_parts, version_prefix): the health body is
+    parts[0] + timestamp + parts[1] + uptime + parts[2], and the version body
+    is version_prefix + uptime_seconds + b'}'.
+    """
+    name = config.get('project.name', 'Pi Monitor')
+    version = config.get('project.version', '1.0.0')
+    commit = config.get('project.commit', None) or os.environ.get('PI_MONITOR_COMMIT')
+    
+    health_parts = (
+        b'{"status":"healthy","timestamp":"',
+        b'","version":' + _dumps(version) + b',"uptime":',
+        b',"enhanced_monitoring":true,"service":"backend","name":' + _dumps(name) + b'}',
+    )
+    version_prefix = _dumps({
+        "service": "backend",
+        "name": name,
+        "version": version,
+        "commit": commit,
+        "started_at": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started_at)),
+    })[:-1] + b',"uptime_seconds":'
+    return health_parts, version_prefix
+
+
+class _RequestBody:
+    """Request body stream that reads at most Content-Length bytes from the connection"""
+    
+    def __init__(self, rfile, length):
+        self._rfile = rfile
+        self.remaining = length
+    
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        if size <= 0:
+            return b''
+        data = self._rfile.read(size)
+        self.remaining = self.remaining - len(data) if data else 0
+        return data
+
 
-class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
-    daemon_threads = True
+def _encode_cacheable(obj):
+    """Encode obj for the response cache as (json_body, gzip_body or None)"""
+    body = _dumps(obj)
+    if len(body) >= _GZIP_MIN_SIZE:
+        return body, gzip.compress(body, compresslevel=_GZIP_LEVEL)
+    return body, None
+
+
+class ThreadingHTTPServer(_ThreadingHTTPServer):
+    """Thread-per-connection HTTP server (daemon threads, via the stdlib base)"""
+    # socketserver's default listen backlog of 5 drops connections when the
+    # dashboard opens several requests at once
+    request_queue_size = 128
 
 
 class PiMonitorServer:
@@ -47,6 +273,10 @@ class PiMonitorServer:
         self.power_manager = PowerManager()
         self.log_manager = LogManager()
         self.auth_manager = AuthManager()
+        self.common_headers = _build_common_headers()
+        self.response_heads = _build_response_heads(self.common_headers, PiMonitorHandler.protocol_version)
+        self.health_parts, self.version_prefix = _build_body_templates(self.start_time)
+        self.server_signature = _build_server_signature()
         
         # Initialize WebAuthn manager if available
         if WEBAUTHN_ENABLED:
@@ -59,6 +289,26 @@ class PiMonitorServer:
         else:
             self.webauthn_manager = None
         
+        # Bounded LRU of verified JWTs keyed by SHA-256 of the bearer token; the epoch is
+        # bumped on every invalidation so a verification racing a logout is not cached
+        self._jwt_cache = OrderedDict()
+        self._jwt_cache_lock = threading.Lock()
+        self._jwt_cache_epoch = 0
+        
+        # Short-lived cache of encoded GET responses, keyed by request path + query
+        self.response_cache = ResponseCache()
+        
+        # (expires_at, body) for the short-lived auth status cache
+        self._auth_status_cache = (0.0, None)
+        
+        # Wall-clock timestamp for response bodies, refreshed once a second by _start_background_services
+        self.now_str = time.strftime('%Y-%m-%d %H:%M:%S')
+        self.now_bytes = self.now_str.encode()
+        
+        # Set on shutdown to wake the background threads so they can exit cleanly
+        self._stop_event = threading.Event()
+        self._cleanup_thread = None
+        
         # Start background services
         self._start_background_services()
     
@@ -66,19 +316,135 @@ class PiMonitorServer:
         """Start background services like metrics collection"""
         self.metrics_collector.start_collection()
         
+        # Responses only carry second-resolution timestamps, so format them once a second
+        # here instead of calling strftime on every request
+        def update_clock():
+            while not self._stop_event.wait(1 - time.time() % 1):
+                now_str = time.strftime('%Y-%m-%d %H:%M:%S')
+                self.now_str, self.now_bytes = now_str, now_str.encode()
+        
+        clock_thread = threading.Thread(target=update_clock, daemon=True)
+        clock_thread.start()
+        
+        # Request threads only enqueue access log lines; this thread writes whatever
+        # has accumulated with a single write/flush so they never contend on stdout
+        def write_access_log():
+            while True:
+                lines = [_access_log.get()]
+                try:
+                    while True:
+                        lines.append(_access_log.get_nowait())
+                except queue.Empty:
+                    pass
+                try:
+                    sys.stdout.write(''.join(lines))
+                    sys.stdout.flush()
+                except Exception:
+                    pass
+        
+        log_thread = threading.Thread(target=write_access_log, daemon=True)
+        log_thread.start()
+        
         # Start database cleanup task
         def cleanup_database():
-            while True:
+            # Hourly, bounded batches keep each run short instead of one large daily DELETE
+            while not self._stop_event.wait(60 * 60):
                 try:
-                    time.sleep(24 * 60 * 60)  # 24 hours
                     deleted_count = self.database.cleanup_old_data(days_to_keep=30)
                     if deleted_count > 0:
                         print(f"🧹 Cleaned up {deleted_count} old metrics records")
                 except Exception as e:
                     print(f"❌ Database cleanup error: {e}")
         
-        cleanup_thread = threading.Thread(target=cleanup_database, daemon=True)
-        cleanup_thread.start()
+        self._cleanup_thread = threading.Thread(target=cleanup_database, daemon=True)
+        self._cleanup_thread.start()
+    
+    def verify_jwt_token(self, token):
+        """Verify a WebAuthn JWT, skipping signature verification on cache hits.
+        
+        Cache hits do not touch the session; its activity timestamp is refreshed
+        when the entry expires and the token is verified again, so it lags by at
+        most _JWT_CACHE_TTL seconds.
+        """
+        entry = self._get_jwt_entry(token)
+        if entry is not None:
+            return entry['claims']
+        
+        epoch = self._jwt_cache_epoch
+        claims = self.webauthn_manager.verify_jwt_token(token)
+        if claims is None:
+            return None
+        
+        now = int(_time())
+        key = hashlib.sha256(token.encode()).digest()
+        with self._jwt_cache_lock:
+            if epoch != self._jwt_cache_epoch:
+                # A token was invalidated while this one was being verified
+                return claims
+            self._jwt_cache[key] = {
+                'exp': min(int(claims.get('exp', now)), now + _JWT_CACHE_TTL),
+                'claims': claims,
+            }
+            self._jwt_cache.move_to_end(key)
+            while len(self._jwt_cache) > _JWT_CACHE_MAX:
+                self._jwt_cache.popitem(last=False)
+        return claims
+    
+    def get_user_info(self, token):
+        """Return user info for a JWT, cached alongside its verified claims"""
+        if self.verify_jwt_token(token) is None:
+            return None
+        
+        entry = self._get_jwt_entry(token)
+        if entry is not None and 'user_info' in entry:
+            return entry['user_info']
+        
+        user_info = self.webauthn_manager.get_user_info(token)
+        if user_info and entry is not None:
+            entry['user_info'] = user_info
+        return user_info
+    
+    def invalidate_jwt_token(self, token):
+        """Drop a token from the verification cache (e.g. on logout)"""
+        key = hashlib.sha256(token.encode()).digest()
+        with self._jwt_cache_lock:
+            self._jwt_cache.pop(key, None)
+            self._jwt_cache_epoch += 1
+    
+    def get_auth_status(self):
+        """Return the encoded auth status, rebuilding it at most once per _AUTH_STATUS_TTL"""
+        now = time.monotonic()
+        expires_at, body = self._auth_status_cache
+        if body is not None and expires_at > now:
+            return body
+        
+        status = {
+            'webauthn_enabled': self.webauthn_manager is not None,
+            'api_key_auth': True,  # Legacy API key auth still available
+        }
+        if self.webauthn_manager:
+            status.update(self.webauthn_manager.get_stats())
+        
+        body = _dumps(status)
+        self._auth_status_cache = (now + _AUTH_STATUS_TTL, body)
+        return body
+    
+    def invalidate_auth_status(self):
+        """Force the next auth status request to rebuild (e.g. after login or logout)"""
+        self._auth_status_cache = (0.0, None)
+    
+    def _get_jwt_entry(self, token):
+        """Return the live cache entry for a token, evicting it if expired"""
+        key = hashlib.sha256(token.encode()).digest()
+        with self._jwt_cache_lock:
+            entry = self._jwt_cache.get(key)
+            if entry is None:
+                return None
+            if not entry['exp'] > _time():
+                del self._jwt_cache[key]
+                return None
+            self._jwt_cache.move_to_end(key)
+            return entry
     
     def run(self):
         """Run the HTTP server"""
@@ -118,6 +484,10 @@ class PiMonitorServer:
     def _shutdown(self):
         """Shutdown the server and cleanup"""
         print("\n🛑 Shutting down server...")
+        self._stop_event.set()
+        if self._cleanup_thread is not None:
+            # Wait for a running cleanup batch to commit instead of killing it mid-statement
+            self._cleanup_thread.join(timeout=5)
         print("🛑 Stopping metrics collection...")
         self.metrics_collector.stop_collection()
         print("🛑 Shutting down HTTP server...")
@@ -129,32 +499,30 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
     
     server_instance = None  # Will be set by server
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.request_start_time = time.time()
+    # Keep connections open between requests; idle clients are dropped after the timeout
+    protocol_version = 'HTTP/1.1'
+    timeout = 30
+    # Set TCP_NODELAY on each connection so split writes (large bodies, streamed
+    # logs) are not held back by Nagle waiting on the client's delayed ACK
+    disable_nagle_algorithm = True
+    
     
     def log_message(self, format_str, *args):
         """Custom logging with performance metrics"""
         try:
             execution_time = time.time() - getattr(self, 'request_start_time', time.time())
-            print(f"{self.client_address[0]} - {format_str % args} - {execution_time:.3f}s")
+            _access_log.put(f"{self.client_address[0]} - {format_str % args} - {execution_time:.3f}s\n")
         except Exception:
-            print(f"{self.client_address[0]} - {format_str % args}")
+            _access_log.put(f"{self.client_address[0]} - {format_str % args}\n")
 
     def version_string(self):
         """Reduce server signature exposure"""
-        try:
-            from config import config as _config
-            name = _config.get('project.name', 'Pi Monitor')
-            version = _config.get('project.version', '1.0.0')
-            return f"{name}/{version}"
-        except Exception:
-            return "PiMonitor"
+        return self.server_instance.server_signature
     
-    def setup(self):
-        """Setup method called before handling each request"""
-        super().setup()
+    def parse_request(self):
+        """Stamp the start time of each request on a persistent connection"""
         self.request_start_time = time.time()
+        return super().parse_request()
     
     @rate_limit(max_requests=100, window=60)
     def do_GET(self):
@@ -163,65 +531,34 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
         path = parsed_url.path
         query_params = parse_qs(parsed_url.query)
         
-        # Route to appropriate handler
-        if path == '/health':
-            self._handle_health_check()
+        # Exact paths resolve in one dict lookup; prefixes are only tried for /api/ misses
+        route = _GET_ROUTES.get(path)
+        if route is not None:
+            route(self, query_params)
         elif path.startswith('/api/'):
-            # Handle all API endpoints
-            if path == '/api/version':
-                self._handle_version()
-            elif path == '/api/auth/user':
-                self._handle_get_user_info()
-            elif path == '/api/auth/status':
-                self._handle_auth_status()
-            elif path == '/api/system':
-                self._handle_system_stats(query_params)
-            elif path == '/api/system/enhanced':
-                self._handle_enhanced_system_stats()
-            elif path == '/api/system/info':
-                self._handle_system_info_detail()
-            elif path == '/api/services':
-                self._handle_services_list()
-            elif path == '/api/network':
-                self._handle_network_info()
-            elif path == '/api/network/stats':
-                self._handle_network_stats()
-            elif path == '/api/logs':
-                self._handle_logs_list(query_params)
-            elif path.startswith('/api/logs/') and '?' in self.path:
-                self._handle_log_read(query_params)
-            elif path.startswith('/api/logs/') and '/download' in path:
-                self._handle_log_download()
-            elif path.startswith('/api/logs/') and path.endswith('/clear'):
-                self._handle_log_clear()
-            elif path.startswith('/api/metrics/history'):
-                self._handle_metrics_history(query_params)
-            elif path.startswith('/api/metrics/range'):
-                self._handle_metrics_range(query_params)
-            elif path == '/api/metrics/database':
-                self._handle_database_stats()
-            elif path == '/api/metrics/export':
-                self._handle_metrics_export()
-            elif path == '/api/metrics/interval':
-                self._handle_metrics_interval(query_params)
-            elif path == '/api/metrics/retention':
-                self._handle_metrics_retention(query_params)
-            elif path == '/api/metrics':
-                self._handle_metrics_summary()
-            elif path == '/api/test':
-                self._handle_test_endpoint()
-            elif path == '/api/refresh':
-                self._handle_refresh()
-            elif path == '/api/power':
-                self._handle_power_status_get()
-            elif path.startswith('/api/service/'):
-                self._handle_service_endpoints(path)
-            else:
-                self._handle_404()
+            for prefix, prefix_route in _GET_PREFIX_ROUTES:
+                if path.startswith(prefix) and prefix_route(self, path, query_params) is not False:
+                    return
+            self._handle_404()
         else:
             # Serve static files (frontend) for all non-API routes
             self._handle_static_files(path)
     
+    def _route_log_get(self, path, query_params):
+        """Dispatch /api/logs/<name>[/<action>] requests; returns False when none match"""
+        # One split gives ['', 'api', 'logs', name] or ['', 'api', 'logs', name, action]
+        parts = path.split('/', 4)
+        if not parts[3]:
+            return False
+        if len(parts) == 4:
+            self._handle_log_read(query_params, parts[3])
+        elif parts[4] == 'download':
+            self._handle_log_download(parts[3])
+        elif parts[4] == 'clear':
+            self._handle_log_clear(parts[3])
+        else:
+            return False
+    
     def do_HEAD(self):
         """Handle HEAD requests (no response body)"""
         parsed_url = urlparse(self.path)
@@ -255,6 +592,7 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
                 self.send_response(200)
                 self.send_header('Content-type', 'text/html' if path.endswith('.html') else 'application/octet-stream')
                 self._set_cors_headers()
+                self.end_headers()
                 return
         except Exception:
             pass
@@ -266,38 +604,35 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
 
     def do_POST(self):
         """Handle POST requests"""
+        try:
+            length = max(int(self.headers.get('Content-Length') or 0), 0)
+        except ValueError:
+            length = 0
+        if length > _MAX_POST_BODY:
+            self.close_connection = True
+            self._write_response(413, _PAYLOAD_TOO_LARGE_BODY, extra_headers=b"Connection: close\r\n")
+            return
+        
+        # Handlers read the body themselves; one rejected before reading it (e.g. on 401)
+        # leaves unread bytes on the socket, so that connection is closed rather than reused
+        rfile = self.rfile
+        body = self.rfile = _RequestBody(rfile, length)
+        try:
+            self._route_post()
+        finally:
+            self.rfile = rfile
+            if body.remaining:
+                self.close_connection = True
+    
+    def _route_post(self):
+        """Dispatch a POST request to its handler"""
         parsed_url = urlparse(self.path)
         path = parsed_url.path
         
-        # Route to appropriate handler
-        if path == '/api/auth/token':
-            self._handle_auth()
-        elif path == '/api/auth/webauthn/register/begin':
-            self._handle_webauthn_register_begin()
-        elif path == '/api/auth/webauthn/register/complete':
-            self._handle_webauthn_register_complete()
-        elif path == '/api/auth/webauthn/authenticate/begin':
-            self._handle_webauthn_authenticate_begin()
-        elif path == '/api/auth/webauthn/authenticate/complete':
-            self._handle_webauthn_authenticate_complete()
-        elif path == '/api/auth/logout':
-            self._handle_logout()
-        elif path == '/api/services':
-            self._handle_services_post()
-        elif path == '/api/power':
-            self._handle_power_action()
-        elif path == '/api/power/shutdown':
-            self._handle_power_shutdown()
-        elif path == '/api/power/restart':
-            self._handle_power_restart()
-        elif path == '/api/power/sleep':
-            self._handle_power_sleep()
-        elif path == '/api/metrics/clear':
-            self._handle_metrics_clear()
-        elif path == '/api/metrics/interval':
-            self._handle_metrics_interval(parse_qs(urlparse(self.path).query))
-        elif path == '/api/metrics/retention':
-            self._handle_metrics_retention(parse_qs(urlparse(self.path).query))
+        # Route to appropriate handler: exact paths in one dict lookup, then prefixes
+        route = _POST_ROUTES.get(path)
+        if route is not None:
+            route(self, parsed_url)
         elif path.startswith('/api/service/'):
             self._handle_service_post_endpoints(path)
         else:
@@ -305,190 +640,100 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
     
     def do_OPTIONS(self):
         """Handle CORS preflight"""
-        self.send_response(200)
-        self._set_cors_headers()
-        self.end_headers()
+        self.log_request(204)
+        self.wfile.write(_PREFLIGHT_RESPONSE)
     
     # Handler methods for different endpoints
     def _handle_health_check(self):
         """Handle health check"""
-        self.send_response(200)
-        self._set_common_headers()
-        
-        response = {
-            "status": "healthy",
-            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
-            "version": config.get('project.version', '1.0.0'),
-            "uptime": self.server_instance.system_monitor.get_uptime(),
-            "enhanced_monitoring": True,
-            "service": "backend",
-            "name": config.get('project.name', 'Pi Monitor')
-        }
-        self.wfile.write(json.dumps(response).encode())
+        # Only the timestamp and uptime vary; the rest of the body is pre-encoded
+        head, middle, tail = self.server_instance.health_parts
+        body = (head + self.server_instance.now_bytes + middle
+                + _dumps(self.server_instance.system_monitor.get_uptime()) + tail)
+        self._write_response(200, body)
 
     def _handle_version(self):
         """Return backend version and build information"""
-        self.send_response(200)
-        self._set_common_headers()
-        version = config.get('project.version', '1.0.0')
-        name = config.get('project.name', 'Pi Monitor')
-        commit = config.get('project.commit', None) or os.environ.get('PI_MONITOR_COMMIT')
-        started_at = self.server_instance.start_time
-        response = {
-            "service": "backend",
-            "name": name,
-            "version": version,
-            "commit": commit,
-            "started_at": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started_at)),
-            "uptime_seconds": int(time.time() - started_at)
-        }
-        self.wfile.write(json.dumps(response).encode())
+        uptime_seconds = int(time.time() - self.server_instance.start_time)
+        self._write_response(200, self.server_instance.version_prefix + b'%d}' % uptime_seconds)
     
+    @require_auth
     def _handle_system_stats(self, query_params):
         """Handle system stats"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
         if 'history' in query_params:
             minutes = int(query_params.get('history', ['60'])[0])
-            response = self.server_instance.system_monitor.get_system_stats_with_history(minutes)
+            self._write_cached(
+                _CACHE_TTL_LIVE,
+                lambda: self.server_instance.system_monitor.get_system_stats_with_history(minutes),
+                (('history', minutes),)
+            )
         else:
-            response = self.server_instance.system_monitor.get_system_stats()
-            
-        self.wfile.write(json.dumps(response).encode())
+            self._write_cached(_CACHE_TTL_LIVE, self.server_instance.system_monitor.get_system_stats)
     
+    @require_auth
     def _handle_enhanced_system_stats(self):
         """Handle enhanced system stats"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
-        response = self.server_instance.system_monitor.get_enhanced_system_stats()
-        self.wfile.write(json.dumps(response).encode())
+        self._write_cached(_CACHE_TTL_LIVE, self.server_instance.system_monitor.get_enhanced_system_stats)
     
+    @require_auth
     def _handle_system_info_detail(self):
         """Handle system info detail"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
-        response = self.server_instance.system_monitor.get_system_info_detail()
-        self.wfile.write(json.dumps(response).encode())
+        self._write_cached(_CACHE_TTL_STATIC, self.server_instance.system_monitor.get_system_info_detail)
     
+    @require_auth
     def _handle_services_list(self):
         """Handle services list"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
-        response = self.server_instance.service_manager.get_services_list()
-        self.wfile.write(json.dumps(response).encode())
+        self._write_cached(_CACHE_TTL_SERVICES, self.server_instance.service_manager.get_services_list)
     
+    @require_auth
     def _handle_network_info(self):
         """Handle network info"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
-        response = self.server_instance.system_monitor.get_network_info()
-        self.wfile.write(json.dumps(response).encode())
+        self._write_cached(_CACHE_TTL_STATIC, self.server_instance.system_monitor.get_network_info)
     
+    @require_auth
     def _handle_network_stats(self):
         """Handle network stats"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
-        response = self.server_instance.system_monitor.get_network_stats()
-        self.wfile.write(json.dumps(response).encode())
+        self._write_cached(_CACHE_TTL_LIVE, self.server_instance.system_monitor.get_network_stats)
     
+    @require_auth
     def _handle_logs_list(self, query_params):
         """Handle logs list"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
         response = self.server_instance.log_manager.get_logs_list()
-        self.wfile.write(json.dumps(response).encode())
+        self._write_response(200, _dumps(response))
     
-    def _handle_log_read(self, query_params):
+    @require_auth
+    def _handle_log_read(self, query_params, log_name):
         """Handle log read"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
-        # Ensure we extract the log filename from the URL path without query params
-        parsed_url = urlparse(self.path)
-        log_name = parsed_url.path.split('/')[-1]
         lines = int(query_params.get('lines', ['100'])[0])
         response = self.server_instance.log_manager.read_log(log_name, lines)
-        self.wfile.write(json.dumps(response).encode())
+        self._write_response(200, _dumps(response))
     
-    def _handle_log_download(self):
+    @require_auth
+    def _handle_log_download(self, log_name):
         """Handle log download"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
         try:
-            log_name = self.path.split('/')[-2]
             self.server_instance.log_manager.download_log(self, log_name)
         except Exception as e:
             self._send_internal_error(f"Failed to download log: {str(e)}")
     
-    def _handle_log_clear(self):
+    @require_auth
+    def _handle_log_clear(self, log_name):
         """Handle log clear"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
-        log_name = self.path.split('/')[-2]
         response = self.server_instance.log_manager.clear_log(log_name)
-        self.wfile.write(json.dumps(response).encode())
+        self._write_response(200, _dumps(response))
     
+    @require_auth
     def _handle_metrics_history(self, query_params):
         """Handle metrics history"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
         minutes = int(query_params.get('minutes', ['60'])[0])
         include_date = query_params.get('include_date', ['true' if minutes > 60 else 'false'])[0].lower() == 'true'
         
-        response = self.server_instance.metrics_collector.get_metrics_history_formatted(minutes, include_date)
-        self.wfile.write(json.dumps(response).encode())
+        body = self.server_instance.metrics_collector.get_metrics_history_formatted_json(
+            self.server_instance.database, minutes, include_date
+        )
+        self._write_response(200, body)
 
+    @require_auth
     def _handle_metrics_range(self, query_params):
         """Return metrics for a specific time range with optional pagination.
 
@@ -498,9 +743,6 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
           limit: optional int
           offset: optional int
         """
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
         try:
             start_ts = float(query_params.get('start', [str(time.time() - 3600)])[0])
             end_ts = float(query_params.get('end', [str(time.time())])[0])
@@ -516,23 +758,14 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
                 "end": end_ts,
                 "metrics": metrics
             }
-            self.send_response(200)
-            self._set_common_headers()
-            self.wfile.write(json.dumps(response).encode())
+            self._write_response(200, _dumps(response))
         except Exception as e:
             self._send_internal_error(f"Failed to get metrics range: {str(e)}")
     
+    @require_auth
     def _handle_database_stats(self):
         """Handle database stats"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
-        response = self.server_instance.database.get_database_stats()
-        self.wfile.write(json.dumps(response).encode())
+        self._write_cached(_CACHE_TTL_DATABASE, self.server_instance.database.get_database_stats)
 
     def _handle_metrics_summary(self):
         """Handle metrics summary endpoint"""
@@ -545,16 +778,14 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
             
             response = {
                 "status": "ok",
-                "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+                "timestamp": self.server_instance.now_str,
                 "current_metrics": current_metrics,
                 "database_stats": db_stats,
                 "collection_interval": self.server_instance.metrics_collector.get_collection_interval(),
                 "uptime": time.time() - self.server_instance.start_time
             }
             
-            self.send_response(200)
-            self._set_common_headers()
-            self.wfile.write(json.dumps(response).encode())
+            self._write_response(200, _dumps(response))
             
         except Exception as e:
             self._send_internal_error(f"Failed to get metrics summary: {str(e)}")
@@ -565,7 +796,7 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
             response = {
                 "status": "ok",
                 "message": "Test endpoint working!",
-                "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+                "timestamp": self.server_instance.now_str,
                 "backend_version": "2.0.0",
                 "endpoints_available": [
                     "/health",
@@ -576,41 +807,39 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
                 ]
             }
             
-            self.send_response(200)
-            self._set_common_headers()
-            self.wfile.write(json.dumps(response).encode())
+            self._write_response(200, _dumps(response))
             
         except Exception as e:
             self._send_internal_error(f"Test endpoint failed: {str(e)}")
 
+    @require_auth
     def _handle_metrics_export(self):
         """Export metrics as JSON"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
         try:
             # Large range to include most historical data
             metrics = self.server_instance.database.get_metrics_history(minutes=525600, limit=1000000)
-            self.send_response(200)
-            # Override headers for download-friendly response
-            self.send_header('Content-type', 'application/json')
-            self._set_cors_headers()
-            self.end_headers()
             response = {
-                "exported_at": time.strftime('%Y-%m-%d %H:%M:%S'),
+                "exported_at": self.server_instance.now_str,
                 "count": len(metrics),
                 "metrics": metrics
             }
-            self.wfile.write(json.dumps(response).encode())
+            body = _dumps(response)
+            self.send_response(200)
+            # Override headers for download-friendly response
+            self.send_header('Content-type', 'application/json')
+            if self._accepts_gzip():
+                body = gzip.compress(body, compresslevel=_GZIP_LEVEL)
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('Content-Length', str(len(body)))
+            self._set_cors_headers()
+            self._end_headers_with_body(body)
         except Exception as e:
             self._send_internal_error(f"Failed to export metrics: {str(e)}")
 
+    @require_auth
     def _handle_metrics_interval(self, query_params):
         """Handle metrics interval updates"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
         try:
             if self.command == 'GET':
                 # Get current interval
@@ -625,7 +854,7 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
                 if content_length > 0:
                     post_data = self.rfile.read(content_length)
                     try:
-                        data = json.loads(post_data.decode('utf-8'))
+                        data = _loads(post_data)
                         interval_str = data.get('interval', '5')
                         interval_seconds = float(interval_str)
                         
@@ -648,7 +877,7 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
                                     "success": False,
                                     "message": "Failed to update collection interval"
                                 }
-                    except (ValueError, json.JSONDecodeError):
+                    except ValueError:
                         response = {
                             "success": False,
                             "message": "Invalid interval value. Must be a valid number."
@@ -664,19 +893,14 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
                     "message": "Method not allowed. Use GET to retrieve or POST to update."
                 }
             
-            self.send_response(200)
-            self._set_common_headers()
-            self.wfile.write(json.dumps(response).encode())
+            self._write_response(200, _dumps(response))
             
         except Exception as e:
             self._send_internal_error(f"Failed to handle metrics interval: {str(e)}")
 
+    @require_auth
     def _handle_metrics_retention(self, query_params):
         """Handle metrics retention updates"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
         try:
             if self.command == 'GET':
                 # Get current retention setting
@@ -691,7 +915,7 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
                 if content_length > 0:
                     post_data = self.rfile.read(content_length)
                     try:
-                        data = json.loads(post_data.decode('utf-8'))
+                        data = _loads(post_data)
                         retention_str = data.get('retention_hours', '24')
                         retention_hours = int(retention_str)
                         
@@ -714,7 +938,7 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
                                     "success": False,
                                     "message": "Failed to update data retention"
                                 }
-                    except (ValueError, json.JSONDecodeError):
+                    except ValueError:
                         response = {
                             "success": False,
                             "message": "Invalid retention value. Must be a valid number."
@@ -730,157 +954,91 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
                     "message": "Method not allowed. Use GET to retrieve or POST to update."
                 }
             
-            self.send_response(200)
-            self._set_common_headers()
-            self.wfile.write(json.dumps(response).encode())
+            self._write_response(200, _dumps(response))
             
         except Exception as e:
             self._send_internal_error(f"Failed to handle metrics retention: {str(e)}")
 
+    @require_auth
     def _handle_metrics_clear(self):
         """Clear all metrics from the database"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
         try:
             deleted = self.server_instance.database.clear_all_metrics()
-            self.send_response(200)
-            self._set_common_headers()
-            self.wfile.write(json.dumps({"success": True, "deleted": deleted}).encode())
+            self.server_instance.response_cache.clear()
+            self._write_response(200, _dumps({"success": True, "deleted": deleted}))
         except Exception as e:
             self._send_internal_error(f"Failed to clear metrics: {str(e)}")
     
+    @require_auth
     def _handle_refresh(self):
         """Handle refresh"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
         response = self.server_instance.metrics_collector.refresh()
-        self.wfile.write(json.dumps(response).encode())
+        self._write_response(200, _dumps(response))
     
+    @require_auth
     def _handle_power_status_get(self):
         """Handle power status GET"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
         response = self.server_instance.power_manager.get_power_status()
-        self.wfile.write(json.dumps(response).encode())
+        self._write_response(200, _dumps(response))
     
+    @require_auth
     def _handle_service_endpoints(self, path):
         """Handle service-related GET endpoints"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
-        if 'restart' in path:
-            response = self.server_instance.service_manager.get_restart_info()
-        elif 'manage' in path:
-            response = self.server_instance.service_manager.get_manage_info()
-        elif 'info' in path:
-            response = self.server_instance.service_manager.get_service_info()
+        endpoint = _SERVICE_GET_ENDPOINTS.get(path.rstrip('/').rsplit('/', 1)[-1])
+        if endpoint is None:
+            body = _ERR_UNKNOWN_SERVICE_ENDPOINT
         else:
-            response = {"error": "Unknown service endpoint"}
+            body = endpoint(self.server_instance.service_manager, self)
         
-        self.wfile.write(json.dumps(response).encode())
+        self._write_response(200, body)
     
     def _handle_auth(self):
         """Handle authentication"""
-        self.send_response(200)
-        self._set_common_headers()
-        
         response = self.server_instance.auth_manager.handle_auth(self)
-        self.wfile.write(json.dumps(response).encode())
+        self._write_response(200, _dumps(response))
     
+    @require_auth
     def _handle_services_post(self):
         """Handle services POST"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
         response = self.server_instance.service_manager.handle_service_action(self)
-        self.wfile.write(json.dumps(response).encode())
+        self.server_instance.response_cache.clear()
+        self._write_response(200, _dumps(response))
     
+    @require_auth
     def _handle_power_action(self):
         """Handle power action"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
         response = self.server_instance.power_manager.handle_power_action(self)
-        self.wfile.write(json.dumps(response).encode())
+        self._write_response(200, _dumps(response))
     
+    @require_auth
     def _handle_power_shutdown(self):
         """Handle power shutdown"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
         response = self.server_instance.power_manager.shutdown()
-        self.wfile.write(json.dumps(response).encode())
+        self._write_response(200, _dumps(response))
     
+    @require_auth
     def _handle_power_restart(self):
         """Handle power restart"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
         response = self.server_instance.power_manager.restart()
-        self.wfile.write(json.dumps(response).encode())
+        self._write_response(200, _dumps(response))
     
+    @require_auth
     def _handle_power_sleep(self):
         """Handle power sleep"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
         response = self.server_instance.power_manager.sleep()
-        self.wfile.write(json.dumps(response).encode())
+        self._write_response(200, _dumps(response))
     
+    @require_auth
     def _handle_service_post_endpoints(self, path):
         """Handle service-related POST endpoints"""
-        if not self._check_auth():
-            self._send_unauthorized()
-            return
-        
-        self.send_response(200)
-        self._set_common_headers()
-        
-        if 'restart' in path:
-            response = self.server_instance.service_manager.restart_service()
-        elif 'manage' in path:
-            response = self.server_instance.service_manager.manage_service(self)
-        elif 'info' in path:
-            response = self.server_instance.service_manager.get_service_info()
-        else:
+        endpoint = _SERVICE_POST_ENDPOINTS.get(path.rstrip('/').rsplit('/', 1)[-1])
+        if endpoint is None:
             response = {"error": "Unknown service endpoint"}
+        else:
+            response = endpoint(self.server_instance.service_manager, self)
+            self.server_instance.response_cache.clear()
         
-        self.wfile.write(json.dumps(response).encode())
+        self._write_response(200, _dumps(response))
     
     def _handle_static_files(self, path):
         """Handle static file serving for frontend"""
@@ -936,8 +1094,7 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
             self.send_header('Content-type', content_type)
             self.send_header('Content-Length', str(len(content)))
             self._set_cors_headers()
-            self.end_headers()
-            self.wfile.write(content)
+            self._end_headers_with_body(content)
             
         except Exception as e:
             # Fall back to 404 if anything goes wrong
@@ -945,294 +1102,319 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
     
     def _handle_404(self):
         """Handle 404 errors"""
-        self.send_response(404)
-        self._set_common_headers()
-        response = {"error": "Not found"}
-        self.wfile.write(json.dumps(response).encode())
+        self._write_response(404, _NOT_FOUND_BODY)
     
     def _check_auth(self):
         """Check authentication - supports both API key and WebAuthn JWT"""
-        # First try WebAuthn JWT authentication
-        if self._check_webauthn_auth():
+        # Both schemes use a Bearer token; the API key is a plain string compare,
+        # so try it before paying for JWT verification
+        if self.server_instance.auth_manager.check_auth(self):
             return True
         
-        # Fall back to legacy API key authentication
-        return self.server_instance.auth_manager.check_auth(self)
+        return self._check_webauthn_auth()
     
     def _set_common_headers(self):
         """Set common response headers"""
-        self.send_header('Content-type', 'application/json')
-        self._set_cors_headers()
-        # Versioning headers for easier diagnostics
-        try:
-            self.send_header('X-PiMonitor-Name', config.get('project.name', 'Pi Monitor'))
-            self.send_header('X-PiMonitor-Version', config.get('project.version', '1.0.0'))
-            self.send_header('X-PiMonitor-Service', 'backend')
-        except Exception:
-            pass
-        self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-        self.send_header('Pragma', 'no-cache')
-        self.send_header('Expires', '0')
+        self._set_json_headers()
         self.end_headers()
     
+    def _set_json_headers(self):
+        """Queue JSON, CORS, versioning and cache headers without ending the header block"""
+        self._append_header_block(self.server_instance.common_headers)
+    
     def _set_cors_headers(self):
         """Set CORS headers"""
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-        # Expose custom headers so frontend can read versioning
-        self.send_header('Access-Control-Expose-Headers', 'X-PiMonitor-Name, X-PiMonitor-Version, X-PiMonitor-Service')
+        self._append_header_block(_CORS_HEADERS)
+    
+    def _append_header_block(self, block):
+        """Queue a pre-encoded block of header lines in one append"""
+        if self.request_version != 'HTTP/0.9':
+            if not hasattr(self, '_headers_buffer'):
+                self._headers_buffer = []
+            self._headers_buffer.append(block)
+    
+    def _write_response(self, status, body, compressed=None, extra_headers=b''):
+        """Send a JSON response with its headers and body in a single write.
+
+        Small responses are assembled in a thread-local buffer that is reused
+        across requests served by the same worker thread. Large bodies are
+        gzip-compressed when the client accepts it; pass compressed to reuse
+        an already compressed copy of body. extra_headers is a pre-encoded
+        block of header lines appended after the common headers.
+        """
+        # Server/Date headers are skipped: the status line and common headers
+        # come pre-encoded, and only Content-Length is formatted per response
+        self.log_request(status)
+        head = self.server_instance.response_heads.get(status)
+        if head is None:
+            self.send_response_only(status)
+            self._set_json_headers()
+            head = b"".join(self._headers_buffer)
+            self._headers_buffer = []
+        head += extra_headers
+        rfile = self.rfile
+        if type(rfile) is _RequestBody and rfile.remaining:
+            # The handler did not consume the request body; see do_POST
+            self.close_connection = True
+            head += b"Connection: close\r\n"
+        if len(body) >= _GZIP_MIN_SIZE and self._accepts_gzip():
+            body = compressed or gzip.compress(body, compresslevel=_GZIP_LEVEL)
+            head += b"Content-Encoding: gzip\r\n"
+        head += b"Content-Length: %d\r\n\r\n" % len(body)
+        self._write_head_and_body(head, body)
+    
+    def _accepts_gzip(self):
+        """Whether the client advertised gzip in Accept-Encoding"""
+        return 'gzip' in self.headers.get('Accept-Encoding', '')
+    
+    def _end_headers_with_body(self, body):
+        """Finish the queued header block and send it together with body"""
+        self._headers_buffer.append(b"\r\n")
+        head = b"".join(self._headers_buffer)
+        self._headers_buffer = []
+        self._write_head_and_body(head, body)
+    
+    def _write_head_and_body(self, head, body):
+        """Write an encoded header block and body, in a single write when small"""
+        size = len(head) + len(body)
+        if size > _RESPONSE_BUFFER_MAX:
+            self.wfile.write(head)
+            self.wfile.write(body)
+            return
+        
+        buf = getattr(_tls, 'buf', None)
+        if buf is None or len(buf) < size:
+            buf = _tls.buf = bytearray(max(size, _RESPONSE_BUFFER_SIZE))
+        view = memoryview(buf)
+        view[:len(head)] = head
+        view[len(head):size] = body
+        self.wfile.write(view[:size])
+    
+    def _write_cached(self, ttl, build, params=()):
+        """Send build()'s result as JSON, reusing the encoded (and compressed) body for ttl seconds.
+        
+        Entries are keyed by the request path plus params, the (name, value)
+        pairs that change the response; the rest of the query string (such as
+        the frontend's _ts cache buster) is ignored.
+        """
+        key = (urlparse(self.path).path, tuple(sorted(params)))
+        try:
+            (body, compressed), stale = self.server_instance.response_cache.get_or_build(
+                key, ttl, lambda: _encode_cacheable(build())
+            )
+        except Exception as e:
+            # Answer here: an exception escaping do_GET would make rate_limit run the handler again
+            self._send_internal_error_exc(_ERR_BUILD_RESPONSE, e)
+            return
+        self._write_response(200, body, compressed, _STALE_WARNING if stale else b'')
     
     def _send_unauthorized(self):
         """Send unauthorized response"""
-        self.send_response(401)
-        self._set_common_headers()
-        response = {"error": "Unauthorized"}
-        self.wfile.write(json.dumps(response).encode())
+        self._write_response(401, _UNAUTHORIZED_BODY)
     
     def _send_internal_error(self, message):
         """Send internal error response"""
-        self.send_response(500)
-        self._set_common_headers()
         response = {"error": message}
-        self.wfile.write(json.dumps(response).encode())
+        self._write_response(500, _dumps(response))
+    
+    def _send_internal_error_exc(self, prefix, exc):
+        """Send internal error response from a pre-encoded body prefix (see _ERR_*) plus the text of exc"""
+        self._write_response(500, prefix + _dumps(str(exc))[1:-1] + b'"}')
+    
+    def _send_bad_request(self, message):
+        """Send bad request response"""
+        response = {"error": message}
+        self._write_response(400, _dumps(response))
+    
+    def _read_json_body(self):
+        """Read and parse the JSON request body; returns None when there is no body"""
+        content_length = self.headers.get('Content-Length')
+        if not content_length:
+            return None
+        length = int(content_length)
+        if length <= 0:
+            return None
+        return _loads(self.rfile.read(length))
+    
+    def _read_json_request(self):
+        """Read a required JSON object body, sending a 400 and returning None if it is missing or malformed"""
+        try:
+            request_data = self._read_json_body()
+        except ValueError:
+            self._send_bad_request("Invalid JSON body")
+            return None
+        if request_data is None:
+            self._write_response(400, _MISSING_REQUEST_BODY)
+            return None
+        if not isinstance(request_data, dict):
+            self._send_bad_request("Invalid JSON body")
+            return None
+        return request_data
     
     # WebAuthn Authentication Handlers
     def _handle_webauthn_register_begin(self):
         """Handle WebAuthn registration initiation"""
-        if not self.server_instance.webauthn_manager:
-            self.send_response(503)
-            self._set_common_headers()
-            response = {"error": "WebAuthn not available"}
-            self.wfile.write(json.dumps(response).encode())
+        wm = self.server_instance.webauthn_manager
+        if not wm:
+            self._write_response(503, _WEBAUTHN_UNAVAILABLE_BODY)
+            return
+        
+        request_data = self._read_json_request()
+        if request_data is None:
             return
         
+        username = request_data.get('username', 'admin')
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length > 0:
-                post_data = self.rfile.read(content_length)
-                request_data = json.loads(post_data.decode('utf-8'))
-                username = request_data.get('username', 'admin')
-                
-                result = self.server_instance.webauthn_manager.generate_registration_options(username)
-                
-                if 'error' in result:
-                    self.send_response(400)
-                else:
-                    self.send_response(200)
-                
-                self._set_common_headers()
-                self.wfile.write(json.dumps(result).encode())
-            else:
-                self.send_response(400)
-                self._set_common_headers()
-                response = {"error": "Missing request body"}
-                self.wfile.write(json.dumps(response).encode())
-                
+            result = wm.generate_registration_options(username)
         except Exception as e:
-            self._send_internal_error(f"Registration initiation failed: {str(e)}")
+            self._send_internal_error_exc(_ERR_REGISTER_BEGIN, e)
+            return
+        
+        status = 400 if 'error' in result else 200
+        self._write_response(status, _dumps(result))
     
     def _handle_webauthn_register_complete(self):
         """Handle WebAuthn registration completion"""
-        if not self.server_instance.webauthn_manager:
-            self.send_response(503)
-            self._set_common_headers()
-            response = {"error": "WebAuthn not available"}
-            self.wfile.write(json.dumps(response).encode())
+        wm = self.server_instance.webauthn_manager
+        if not wm:
+            self._write_response(503, _WEBAUTHN_UNAVAILABLE_BODY)
+            return
+        
+        request_data = self._read_json_request()
+        if request_data is None:
+            return
+        
+        user_id = request_data.get('user_id')
+        credential = request_data.get('credential')
+        device_name = request_data.get('device_name', 'Unknown Device')
+        
+        if not user_id or not credential:
+            self._send_bad_request("Missing user_id or credential")
             return
         
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length > 0:
-                post_data = self.rfile.read(content_length)
-                request_data = json.loads(post_data.decode('utf-8'))
-                
-                user_id = request_data.get('user_id')
-                credential = request_data.get('credential')
-                device_name = request_data.get('device_name', 'Unknown Device')
-                
-                if not user_id or not credential:
-                    self.send_response(400)
-                    self._set_common_headers()
-                    response = {"error": "Missing user_id or credential"}
-                    self.wfile.write(json.dumps(response).encode())
-                    return
-                
-                result = self.server_instance.webauthn_manager.verify_registration(
-                    user_id, credential, device_name
-                )
-                
-                if 'error' in result:
-                    self.send_response(400)
-                else:
-                    self.send_response(200)
-                
-                self._set_common_headers()
-                self.wfile.write(json.dumps(result).encode())
-            else:
-                self.send_response(400)
-                self._set_common_headers()
-                response = {"error": "Missing request body"}
-                self.wfile.write(json.dumps(response).encode())
-                
+            result = wm.verify_registration(
+                user_id, credential, device_name
+            )
         except Exception as e:
-            self._send_internal_error(f"Registration completion failed: {str(e)}")
+            self._send_internal_error_exc(_ERR_REGISTER_COMPLETE, e)
+            return
+        
+        self.server_instance.invalidate_auth_status()
+        status = 400 if 'error' in result else 200
+        self._write_response(status, _dumps(result))
     
     def _handle_webauthn_authenticate_begin(self):
         """Handle WebAuthn authentication initiation"""
-        if not self.server_instance.webauthn_manager:
-            self.send_response(503)
-            self._set_common_headers()
-            response = {"error": "WebAuthn not available"}
-            self.wfile.write(json.dumps(response).encode())
+        wm = self.server_instance.webauthn_manager
+        if not wm:
+            self._write_response(503, _WEBAUTHN_UNAVAILABLE_BODY)
             return
         
+        # The body is optional here; without a username any registered credential may be used
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            username = None
-            
-            if content_length > 0:
-                post_data = self.rfile.read(content_length)
-                request_data = json.loads(post_data.decode('utf-8'))
-                username = request_data.get('username')
-            
-            result = self.server_instance.webauthn_manager.generate_authentication_options(username)
-            
-            if 'error' in result:
-                self.send_response(400)
-            else:
-                self.send_response(200)
-            
-            self._set_common_headers()
-            self.wfile.write(json.dumps(result).encode())
-                
+            request_data = self._read_json_body()
+        except ValueError:
+            self._send_bad_request("Invalid JSON body")
+            return
+        username = request_data.get('username') if isinstance(request_data, dict) else None
+        
+        try:
+            result = wm.generate_authentication_options(username)
         except Exception as e:
-            self._send_internal_error(f"Authentication initiation failed: {str(e)}")
+            self._send_internal_error_exc(_ERR_AUTHENTICATE_BEGIN, e)
+            return
+        
+        status = 400 if 'error' in result else 200
+        self._write_response(status, _dumps(result))
     
     def _handle_webauthn_authenticate_complete(self):
         """Handle WebAuthn authentication completion"""
-        if not self.server_instance.webauthn_manager:
-            self.send_response(503)
-            self._set_common_headers()
-            response = {"error": "WebAuthn not available"}
-            self.wfile.write(json.dumps(response).encode())
+        wm = self.server_instance.webauthn_manager
+        if not wm:
+            self._write_response(503, _WEBAUTHN_UNAVAILABLE_BODY)
+            return
+        
+        request_data = self._read_json_request()
+        if request_data is None:
+            return
+        
+        credential = request_data.get('credential')
+        challenge_key = request_data.get('challenge_key')
+        
+        if not credential or not challenge_key:
+            self._send_bad_request("Missing credential or challenge_key")
             return
         
+        # Get request info for session tracking
+        request_info = RequestInfo(self.headers.get('User-Agent'), self.client_address[0])
+        
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length > 0:
-                post_data = self.rfile.read(content_length)
-                request_data = json.loads(post_data.decode('utf-8'))
-                
-                credential = request_data.get('credential')
-                challenge_key = request_data.get('challenge_key')
-                
-                if not credential or not challenge_key:
-                    self.send_response(400)
-                    self._set_common_headers()
-                    response = {"error": "Missing credential or challenge_key"}
-                    self.wfile.write(json.dumps(response).encode())
-                    return
-                
-                # Get request info for session tracking
-                request_info = {
-                    'user_agent': self.headers.get('User-Agent'),
-                    'ip_address': self.client_address[0]
-                }
-                
-                result = self.server_instance.webauthn_manager.verify_authentication(
-                    credential, challenge_key, request_info
-                )
-                
-                if 'error' in result:
-                    self.send_response(400)
-                else:
-                    self.send_response(200)
-                
-                self._set_common_headers()
-                self.wfile.write(json.dumps(result).encode())
-            else:
-                self.send_response(400)
-                self._set_common_headers()
-                response = {"error": "Missing request body"}
-                self.wfile.write(json.dumps(response).encode())
-                
+            result = wm.verify_authentication(
+                credential, challenge_key, request_info
+            )
         except Exception as e:
-            self._send_internal_error(f"Authentication completion failed: {str(e)}")
+            self._send_internal_error_exc(_ERR_AUTHENTICATE_COMPLETE, e)
+            return
+        
+        self.server_instance.invalidate_auth_status()
+        status = 400 if 'error' in result else 200
+        self._write_response(status, _dumps(result))
     
     def _handle_logout(self):
         """Handle logout request"""
-        if not self.server_instance.webauthn_manager:
-            self.send_response(503)
-            self._set_common_headers()
-            response = {"error": "WebAuthn not available"}
-            self.wfile.write(json.dumps(response).encode())
+        wm = self.server_instance.webauthn_manager
+        if not wm:
+            self._write_response(503, _WEBAUTHN_UNAVAILABLE_BODY)
+            return
+        
+        # Get token from Authorization header
+        auth_header = self.headers.get('Authorization', '')
+        if not auth_header.startswith('Bearer '):
+            self._send_bad_request("Missing or invalid token")
             return
         
+        token = auth_header[7:].strip()
         try:
-            # Get token from Authorization header
-            auth_header = self.headers.get('Authorization', '')
-            if not auth_header.startswith('Bearer '):
-                self.send_response(400)
-                self._set_common_headers()
-                response = {"error": "Missing or invalid token"}
-                self.wfile.write(json.dumps(response).encode())
-                return
-            
-            token = auth_header.split(' ')[1]
-            result = self.server_instance.webauthn_manager.logout(token)
-            
-            self.send_response(200)
-            self._set_common_headers()
-            self.wfile.write(json.dumps(result).encode())
-                
+            result = wm.logout(token)
         except Exception as e:
-            self._send_internal_error(f"Logout failed: {str(e)}")
+            self._send_internal_error_exc(_ERR_LOGOUT, e)
+            return
+        finally:
+            # After the session is gone, so a concurrent request cannot re-cache the token
+            self.server_instance.invalidate_jwt_token(token)
+        
+        self.server_instance.invalidate_auth_status()
+        self._write_response(200, _dumps(result))
     
     def _handle_get_user_info(self):
         """Handle get user info request"""
-        if not self.server_instance.webauthn_manager:
-            self.send_response(503)
-            self._set_common_headers()
-            response = {"error": "WebAuthn not available"}
-            self.wfile.write(json.dumps(response).encode())
+        wm = self.server_instance.webauthn_manager
+        if not wm:
+            self._write_response(503, _WEBAUTHN_UNAVAILABLE_BODY)
             return
         
+        # Get token from Authorization header
+        auth_header = self.headers.get('Authorization', '')
+        if not auth_header.startswith('Bearer '):
+            self._send_unauthorized()
+            return
+        
+        token = auth_header[7:].strip()
         try:
-            # Get token from Authorization header
-            auth_header = self.headers.get('Authorization', '')
-            if not auth_header.startswith('Bearer '):
-                self._send_unauthorized()
-                return
-            
-            token = auth_header.split(' ')[1]
-            user_info = self.server_instance.webauthn_manager.get_user_info(token)
-            
-            if user_info:
-                self.send_response(200)
-                self._set_common_headers()
-                response = {'success': True, 'user': user_info}
-                self.wfile.write(json.dumps(response).encode())
-            else:
-                self._send_unauthorized()
-                
+            user_info = self.server_instance.get_user_info(token)
         except Exception as e:
-            self._send_internal_error(f"Get user info failed: {str(e)}")
+            self._send_internal_error_exc(_ERR_USER_INFO, e)
+            return
+        
+        if user_info:
+            self._write_response(200, _USER_INFO_PREFIX + _dumps(user_info) + b'}')
+        else:
+            self._send_unauthorized()
     
     def _handle_auth_status(self):
         """Handle authentication status check"""
-        self.send_response(200)
-        self._set_common_headers()
-        
-        status = {
-            'webauthn_enabled': self.server_instance.webauthn_manager is not None,
-            'api_key_auth': True,  # Legacy API key auth still available
-        }
-        
-        if self.server_instance.webauthn_manager:
-            status.update(self.server_instance.webauthn_manager.get_stats())
-        
-        self.wfile.write(json.dumps(status).encode())
+        self._write_response(200, self.server_instance.get_auth_status())
     
     def _check_webauthn_auth(self):
         """Check WebAuthn JWT authentication"""
@@ -1243,5 +1425,5 @@ class PiMonitorHandler(BaseHTTPRequestHandler):
         if not auth_header.startswith('Bearer '):
             return False
         
-        token = auth_header.split(' ')[1]
-        return self.server_instance.webauthn_manager.verify_jwt_token(token) is not None
+        token = auth_header[7:].strip()
+        return self.server_instance.verify_jwt_token(token) is not None
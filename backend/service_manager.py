@@ -4,107 +4,516 @@ Pi Monitor - Service Management
 Handles system service control and management
 """
 
-import json
+import os
 import subprocess
 import time
 import logging
+import threading
 import platform
 import shutil
-import re
+from operator import itemgetter
+
+from utils import json_dumps, json_loads
+
+# Optional native Windows service API (pywin32); falls back to 'sc' when missing
+try:
+    import win32service
+except ImportError:
+    win32service = None
+
+# Optional in-process systemd D-Bus client; falls back to 'systemctl' when missing
+try:
+    from pystemd.dbuslib import DBus
+    from pystemd.systemd1 import Manager, Unit
+except ImportError:
+    DBus = Manager = Unit = None
 
 logger = logging.getLogger(__name__)
 
+# systemd active state -> status reported to the UI
+_UNIT_STATUS = {
+    'active': 'running',
+    'running': 'running',
+    'inactive': 'stopped',
+    'dead': 'stopped',
+    'failed': 'failed',
+}
+
+# State-changing actions accepted by handle_service_action
+_SERVICE_ACTIONS = frozenset(('start', 'stop', 'restart'))
+
+# systemd UnitFileState values that count as enabled
+_ENABLED_STATES = frozenset(('enabled', 'enabled-runtime'))
+
+# 'sc query' STATE token -> status reported to the UI
+_WINDOWS_STATUS = {
+    'RUNNING': 'running',
+    'STOPPED': 'stopped',
+    'START_PENDING': 'starting',
+    'STOP_PENDING': 'stopping',
+    'CONTINUE_PENDING': 'starting',
+    'PAUSE_PENDING': 'stopping',
+    'PAUSED': 'paused',
+}
+
+# SERVICE_STATUS.dwCurrentState -> 'sc query' STATE token
+_WINDOWS_STATE_CODES = {
+    1: 'STOPPED',
+    2: 'START_PENDING',
+    3: 'STOP_PENDING',
+    4: 'RUNNING',
+    5: 'CONTINUE_PENDING',
+    6: 'PAUSE_PENDING',
+    7: 'PAUSED',
+}
+
+# SERVICE_DISABLED start type from QueryServiceConfig
+_WINDOWS_START_DISABLED = 4
+
+
+def _parse_sc_state(output):
+    """Status of a service from 'sc query' output, read from its STATE line"""
+    # e.g. "        STATE              : 4  RUNNING"
+    start = output.find('STATE')
+    if start < 0:
+        return 'stopped'
+    end = output.find('\n', start)
+    for token in output[start:end if end >= 0 else None].split():
+        status = _WINDOWS_STATUS.get(token)
+        if status is not None:
+            return status
+    return 'stopped'
+
+
+# systemctl stderr fragments that mean the action needs more privileges
+_AUTH_ERROR_WORDS = ('access denied', 'permission', 'authentication is required', 'not authorized', 'polkit')
+
+# Spawn options for the short-lived, non-interactive tool calls: skip the
+# close_fds descriptor sweep (our fds are non-inheritable anyway) and the
+# signal-handler reset. Without close_fds CPython can use posix_spawn, but
+# only when argv[0] has a directory part, so pass the resolved tool paths
+_QUICK_SPAWN = {'close_fds': False, 'restore_signals': False}
+
+# Service management tools reported by /api/service/info: (name, recommendation)
+_MANAGEMENT_TOOLS = (
+    ('systemctl', 'Use systemctl for service management (most reliable)'),
+    ('service', 'Use service command as fallback'),
+    ('docker', 'Use Docker commands if running in container'),
+)
+
+
+# Tools are looked up on PATH again after this long, to notice installs/removals
+_TOOL_RESOLVE_TTL = 60 * 60
+
+# How long a "systemctl needs sudo" result is trusted before plain systemctl is tried again
+_SUDO_RECHECK_SECONDS = 60 * 60
+
+# Unit properties requested from 'systemctl show' for a service status
+_SHOW_PROPERTIES = 'LoadState,ActiveState,UnitFileState,Description'
+
+
+def _dbus_unit_properties(bus, svc_names):
+    """Read the _SHOW_PROPERTIES of each unit over the given systemd D-Bus connection.
+
+    Returns dicts shaped like _parse_systemctl_show() output.
+    """
+    units = []
+    for name in svc_names:
+        unit_name = name if '.' in name else f'{name}.service'
+        unit = Unit(unit_name.encode(), bus=bus, _autoload=True)
+        props = {}
+        for key in _SHOW_PROPERTIES.split(','):
+            value = getattr(unit.Unit, key)
+            props[key] = value.decode('utf-8', 'replace') if isinstance(value, bytes) else str(value)
+        units.append(props)
+    return units
+
+
+def _iter_show_blocks(lines):
+    """Yield one {property: value} dict per unit from 'systemctl show' output lines.
+
+    Units are separated by blank lines, in the order they were requested.
+    """
+    props = {}
+    for line in lines:
+        key, sep, value = line.rstrip('\n').partition('=')
+        if sep:
+            props[key] = value
+        elif props and not key.strip():
+            yield props
+            props = {}
+    if props:
+        yield props
+
+
+def _parse_systemctl_show(output):
+    """Parse 'systemctl show' output into one {property: value} dict per unit"""
+    return list(_iter_show_blocks(output.splitlines()))
+
+
+# Unit properties requested from 'systemctl show' when enumerating all services
+_LIST_PROPERTIES = 'Id,LoadState,ActiveState,SubState,UnitFileState,Description'
+
+# GET /api/service/restart and /api/service/manage bodies; static, so encoded once at import
+_RESTART_INFO = {
+    "endpoint": "/api/service/restart",
+    "description": "Safe service restart endpoint",
+    "methods": {
+        "GET": "Get endpoint information",
+        "POST": "Execute safe service restart"
+    },
+    "safety_features": [
+        "No system shutdown/restart",
+        "Service restart only",
+        "Multiple fallback methods",
+        "Graceful process handling"
+    ],
+    "available_methods": [
+        "systemctl restart",
+        "service restart",
+        "docker restart"
+    ],
+    "usage": {
+        "method": "POST",
+        "headers": "Authorization: Bearer <token>",
+        "body": "{} (no body required)"
+    }
+}
+_MANAGE_INFO = {
+    "endpoint": "/api/service/manage",
+    "description": "Service management endpoint",
+    "methods": {
+        "GET": "Get endpoint information",
+        "POST": "Execute service management actions"
+    },
+    "available_actions": ["start", "stop", "status"],
+    "safety_features": [
+        "Service-level operations only",
+        "No system impact",
+        "Standard systemctl/service commands"
+    ],
+    "usage": {
+        "method": "POST",
+        "headers": "Authorization: Bearer <token>",
+        "body": '{"action": "start|stop|status"}'
+    }
+}
+RESTART_INFO_JSON = json_dumps(_RESTART_INFO)
+MANAGE_INFO_JSON = json_dumps(_MANAGE_INFO)
+
+
+def _unit_tables_from_show(units):
+    """Convert 'systemctl show' unit blocks into list-units / list-unit-files rows"""
+    unit_rows = []
+    file_rows = []
+    for props in units:
+        unit = props.get('Id', '')
+        unit_rows.append({'unit': unit, 'load': props.get('LoadState', ''), 'active': props.get('ActiveState', ''),
+                          'sub': props.get('SubState', ''), 'description': props.get('Description', '')})
+        if props.get('UnitFileState'):
+            file_rows.append({'unit_file': unit, 'state': props['UnitFileState']})
+    return unit_rows, file_rows
+
+
+def _dbus_unit_tables(bus):
+    """List service units and unit files from systemd's Manager over D-Bus.
+
+    Returns rows shaped like the 'systemctl list-units' / 'list-unit-files'
+    --output=json tables.
+    """
+    manager = Manager(bus=bus, _autoload=True)
+    unit_rows = manager.Manager.ListUnitsByPatterns([], [b'*.service'])
+    file_rows = manager.Manager.ListUnitFilesByPatterns([], [b'*.service'])
+    units = [
+        {'unit': name.decode(), 'load': load.decode(), 'active': active.decode(), 'sub': sub.decode(),
+         'description': description.decode('utf-8', 'replace')}
+        for name, description, load, active, sub, *_ in unit_rows
+    ]
+    unit_files = [
+        {'unit_file': os.path.basename(path.decode()), 'state': state.decode()}
+        for path, state in file_rows
+    ]
+    return units, unit_files
+
+
+def _json_rows(returncode, output):
+    """Rows of a 'systemctl list-* --output=json' table, or None if JSON output is unavailable.
+
+    output is the raw stdout bytes; json_loads decodes them itself.
+    """
+    if returncode != 0:
+        return None
+    try:
+        rows = json_loads(output)
+    except ValueError:
+        return None
+    return rows if isinstance(rows, list) else None
+
+
+def _parse_list_units_text(output):
+    """Parse plain 'systemctl list-units' columns into the rows --output=json would give"""
+    rows = []
+    for line in output.splitlines():
+        # Columns: UNIT LOAD ACTIVE SUB DESCRIPTION
+        parts = line.split(None, 4)
+        if parts and not parts[0].endswith('.service'):
+            # Without --plain systemd prefixes failed units with a '●' marker column
+            parts = line.split(None, 5)[1:]
+        if len(parts) < 5 or not parts[0].endswith('.service'):
+            continue
+        rows.append({'unit': parts[0], 'load': parts[1], 'active': parts[2], 'sub': parts[3],
+                     'description': parts[4].rstrip()})
+    return rows
+
+
+def _parse_unit_files_text(output):
+    """Parse plain 'systemctl list-unit-files' columns into the rows --output=json would give"""
+    rows = []
+    for line in output.splitlines():
+        # Format: UNITFILE <whitespace> STATE [PRESET]
+        parts = line.split(None, 2)
+        if len(parts) >= 2:
+            rows.append({'unit_file': parts[0], 'state': parts[1]})
+    return rows
+
+
 class ServiceManager:
     """Manages system services"""
     
     def __init__(self):
         # Kept for fallback when full enumeration is unavailable
         self.candidate_services = ['ssh', 'nginx', 'docker', 'pi-monitor']
+        # name -> (expires_at, service dict); absorbs repeated dashboard polls
+        self._status_cache = {}
+        self._status_cache_ttl = 2.0
+        # (expires_at, (list-units rows, list-unit-files rows)) from the last enumeration
+        self._unit_tables_cache = None
+        self._unit_tables_ttl = 2.0
+        # Running as root (the usual daemon setup) makes the sudo retry pointless
+        self._is_root = hasattr(os, 'geteuid') and os.geteuid() == 0
+        self._system = platform.system()
+        self._resolve_tools()
+        # Whether actions needed sudo last time (None = unknown); re-probed after _SUDO_RECHECK_SECONDS
+        self._needs_sudo = None
+        self._needs_sudo_at = 0.0
+        # systemd D-Bus connection (pystemd), shared by all requests
+        self._bus = None
+        self._bus_lock = threading.Lock()
+        # Service Control Manager handle, opened once when pywin32 is available
+        self._scm = None
+        if win32service is not None and self._system == 'Windows':
+            try:
+                self._scm = win32service.OpenSCManager(None, None, win32service.SC_MANAGER_ENUMERATE_SERVICE)
+            except Exception as e:
+                logger.debug(f"OpenSCManager failed, using 'sc' instead: {e}")
     
+    def _sudo_known_required(self):
+        """Whether a recent action found that systemctl only succeeds under sudo"""
+        return bool(self._needs_sudo) and time.monotonic() - self._needs_sudo_at < _SUDO_RECHECK_SECONDS
+
+    def _remember_sudo(self, needed):
+        """Record whether the last successful action needed sudo"""
+        self._needs_sudo = needed
+        self._needs_sudo_at = time.monotonic()
+
+    def _systemd_call(self, query, *args):
+        """Run query(bus, *args) on the shared systemd D-Bus connection.
+
+        The connection is opened on first use and dropped after a failed
+        query, so the next call reconnects.
+        """
+        with self._bus_lock:
+            if self._bus is None:
+                bus = DBus()
+                bus.open()
+                self._bus = bus
+            try:
+                return query(self._bus, *args)
+            except Exception:
+                self._bus.close()
+                self._bus = None
+                raise
+
+    def _refresh_tools(self):
+        """Re-resolve the tool paths once they are older than _TOOL_RESOLVE_TTL"""
+        if time.monotonic() - self._tools_resolved_at >= _TOOL_RESOLVE_TTL:
+            self._resolve_tools()
+
+    def _resolve_tools(self):
+        """Look up the service control tools on PATH"""
+        self._tools_resolved_at = time.monotonic()
+        self._systemctl_path = shutil.which('systemctl')
+        self._service_path = shutil.which('service')
+        self._sudo_path = None if self._is_root else shutil.which('sudo')
+        self._sc_path = shutil.which('sc')
+        self._docker_path = shutil.which('docker')
+
     def get_services_list(self):
         """List services with status for ServiceManagement UI.
 
         On Linux, attempts to enumerate ALL services via systemd. On Windows, uses 'sc query'.
         Falls back to a small whitelist if enumeration is not available.
         """
+        self._refresh_tools()
         try:
-            if platform.system() == 'Linux' and shutil.which('systemctl'):
+            if self._system == 'Linux' and self._systemctl_path:
                 return self._list_systemd_services()
-            if platform.system() == 'Windows' and shutil.which('sc'):
+            if self._system == 'Windows' and self._sc_path:
                 return self._list_windows_services()
         except Exception as e:
             logger.warning(f"Service enumeration failed, falling back to candidates: {e}")
 
-        # Fallback to the predefined small set
-        services = []
-        for svc in self.candidate_services:
-            services.append(self._get_single_service_status(svc))
-        return services
+        # Fallback to the predefined small set, queried together in one call
+        return self._get_services_status_bulk(self.candidate_services)
 
     def _list_systemd_services(self):
         """Enumerate services using systemctl list-units and list-unit-files."""
-        services = []
-        # Get active/runtime status and description
-        result = subprocess.run(
-            ['systemctl', 'list-units', '--type=service', '--all', '--no-legend', '--no-pager', '--plain'],
-            capture_output=True, text=True, timeout=15
-        )
-        lines = result.stdout.splitlines() if result.returncode == 0 else []
-
-        # Also gather enabled/disabled from unit-files
+        # Active and inactive services are collected apart so each needs only a name sort
+        running = []
+        other = []
+        units, unit_files = self._list_unit_tables()
         enabled_map = {}
-        try:
-            files_out = subprocess.run(
-                ['systemctl', 'list-unit-files', '--type=service', '--no-legend', '--no-pager'],
-                capture_output=True, text=True, timeout=15
-            )
-            if files_out.returncode == 0:
-                for line in files_out.stdout.splitlines():
-                    # Format: UNITFILE <whitespace> STATE [PRESET]
-                    parts = re.split(r"\s+", line.strip())
-                    if len(parts) >= 2 and parts[0].endswith('.service'):
-                        enabled_map[parts[0]] = (parts[1] == 'enabled')
-        except Exception:
-            pass
-
-        def normalize_status(active_col: str) -> str:
-            if active_col in ('active', 'running'):
-                return 'running'
-            if active_col in ('inactive', 'dead', 'failed'):
-                return 'stopped' if active_col != 'failed' else 'failed'
-            return active_col or 'unknown'
-
-        for line in lines:
-            # Columns: UNIT LOAD ACTIVE SUB DESCRIPTION
-            parts = re.split(r"\s+", line.strip(), maxsplit=4)
-            if len(parts) < 5:
+        for row in unit_files:
+            unit_file = row.get('unit_file', '')
+            if unit_file.endswith('.service'):
+                enabled_map[unit_file] = row.get('state') in _ENABLED_STATES
+
+        for row in units:
+            unit = row.get('unit', '')
+            if not unit:
                 continue
-            unit, load, active_col, sub, description = parts
 
             # Include ALL units, including templated and internal ones, as requested
-            name = unit.replace('.service', '')
-            status = normalize_status(active_col)
+            name = unit[:-8] if unit.endswith('.service') else unit
+            active_col = row.get('active', '')
+            status = _UNIT_STATUS.get(active_col) or active_col or 'unknown'
             active = (status == 'running')
             enabled = enabled_map.get(unit, False)
-            services.append({
+            (running if active else other).append({
                 'name': name,
                 'status': status,
                 'active': active,
                 'enabled': enabled,
-                'description': description or f'{name} service'
+                'description': row.get('description') or name + ' service'
             })
 
-        # Sort by active first then name; return all services
-        services.sort(key=lambda s: (not s['active'], s['name']))
-        return services
+        # Active first then by name; return all services
+        by_name = itemgetter('name')
+        running.sort(key=by_name)
+        other.sort(key=by_name)
+        running.extend(other)
+        return running
+
+    def _list_unit_tables(self):
+        """Rows of 'systemctl list-units' and 'list-unit-files' for services.
+
+        Both tables are kept for _unit_tables_ttl seconds so requests arriving
+        together share one enumeration.
+        """
+        cached = self._unit_tables_cache
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        if DBus is not None:
+            try:
+                tables = self._systemd_call(_dbus_unit_tables)
+                self._unit_tables_cache = (time.monotonic() + self._unit_tables_ttl, tables)
+                return tables
+            except Exception as e:
+                logger.debug(f"systemd D-Bus listing failed, using systemctl instead: {e}")
+
+        # One 'systemctl show' over every loaded service carries both tables;
+        # its blocks are parsed as they stream in rather than after a full capture
+        units = []
+        try:
+            proc = subprocess.Popen(
+                [self._systemctl_path, 'show', f'--property={_LIST_PROPERTIES}', '--', '*.service'],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, errors='replace', **_QUICK_SPAWN
+            )
+        except Exception:
+            proc = None
+        if proc is not None:
+            watchdog = threading.Timer(15, proc.kill)
+            watchdog.start()
+            try:
+                with proc.stdout:
+                    units = [props for props in _iter_show_blocks(proc.stdout) if props.get('Id')]
+                if proc.wait() != 0:
+                    units = []
+            except Exception:
+                units = []
+            finally:
+                watchdog.cancel()
+        if units:
+            tables = _unit_tables_from_show(units)
+            self._unit_tables_cache = (time.monotonic() + self._unit_tables_ttl, tables)
+            return tables
+
+        # Older systemd without unit patterns for 'show': list both tables separately.
+        # Start list-unit-files (enabled/disabled) first so it runs alongside list-units
+        try:
+            files_proc = subprocess.Popen(
+                [self._systemctl_path, 'list-unit-files', '--type=service', '--no-legend', '--no-pager', '--output=json'],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, **_QUICK_SPAWN
+            )
+        except Exception:
+            files_proc = None
+
+        try:
+            # Get active/runtime status and description
+            result = subprocess.run(
+                [self._systemctl_path, 'list-units', '--type=service', '--all', '--no-legend', '--no-pager', '--plain',
+                 '--output=json'],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=15, **_QUICK_SPAWN
+            )
+        except Exception:
+            if files_proc is not None:
+                files_proc.kill()
+                files_proc.wait()
+            raise
+        units = _json_rows(result.returncode, result.stdout)
+        if units is None:
+            # systemd without JSON table output: parse the plain columns instead
+            result = subprocess.run(
+                [self._systemctl_path, 'list-units', '--type=service', '--all', '--no-legend', '--no-pager', '--plain'],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, errors='replace', timeout=15, **_QUICK_SPAWN
+            )
+            units = _parse_list_units_text(result.stdout) if result.returncode == 0 else []
+
+        # Also gather enabled/disabled from unit-files
+        unit_files = None
+        if files_proc is not None:
+            try:
+                files_stdout, _ = files_proc.communicate(timeout=15)
+                unit_files = _json_rows(files_proc.returncode, files_stdout)
+            except Exception:
+                files_proc.kill()
+                files_proc.wait()
+        try:
+            if unit_files is None:
+                files_out = subprocess.run(
+                    [self._systemctl_path, 'list-unit-files', '--type=service', '--no-legend', '--no-pager'],
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, errors='replace', timeout=15, **_QUICK_SPAWN
+                )
+                unit_files = _parse_unit_files_text(files_out.stdout) if files_out.returncode == 0 else []
+        except Exception:
+            unit_files = []
+
+        self._unit_tables_cache = (time.monotonic() + self._unit_tables_ttl, (units, unit_files))
+        return units, unit_files
 
     def _list_windows_services(self):
-        """Enumerate services on Windows using 'sc query' output."""
+        """Enumerate services on Windows via the SCM API, or 'sc query' output without pywin32."""
+        if self._scm is not None:
+            try:
+                return self._list_windows_services_native()
+            except Exception as e:
+                logger.debug(f"EnumServicesStatus failed, using 'sc' instead: {e}")
         services = []
         # 'sc query type= service state= all'
         result = subprocess.run(
-            ['sc', 'query', 'type=', 'service', 'state=', 'all'],
-            capture_output=True, text=True, timeout=20, shell=True
+            [self._sc_path or 'sc', 'query', 'type=', 'service', 'state=', 'all'],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, errors='replace', timeout=20
         )
         cur_name = None
         cur_state = None
@@ -117,85 +526,215 @@ class ServiceManager:
                         'status': 'running' if cur_state == 'RUNNING' else 'stopped',
                         'active': cur_state == 'RUNNING',
                         'enabled': True,  # Windows enable state not trivial here
-                        'description': f'{cur_name} service'
+                        'description': cur_name + ' service'
                     })
                 cur_name = line.split(':', 1)[1].strip()
                 cur_state = None
             elif line.startswith('STATE'):
                 # e.g., STATE              : 4  RUNNING
-                if 'RUNNING' in line:
-                    cur_state = 'RUNNING'
-                elif 'STOPPED' in line:
-                    cur_state = 'STOPPED'
+                tokens = line.split()
+                cur_state = tokens[3] if len(tokens) > 3 else None
         if cur_name is not None:
             services.append({
                 'name': cur_name,
                 'status': 'running' if cur_state == 'RUNNING' else 'stopped',
                 'active': cur_state == 'RUNNING',
                 'enabled': True,
-                'description': f'{cur_name} service'
+                'description': cur_name + ' service'
+            })
+        return services
+
+    def _list_windows_services_native(self):
+        """Enumerate services with a single EnumServicesStatus call on the cached SCM handle."""
+        services = []
+        entries = win32service.EnumServicesStatus(
+            self._scm, win32service.SERVICE_WIN32, win32service.SERVICE_STATE_ALL
+        )
+        for name, _display_name, status in entries:
+            running = status[1] == win32service.SERVICE_RUNNING
+            services.append({
+                'name': name,
+                'status': 'running' if running else 'stopped',
+                'active': running,
+                'enabled': True,  # start type needs a per-service QueryServiceConfig
+                'description': name + ' service'
             })
         return services
 
+    def _get_windows_service_status_native(self, svc_name: str):
+        """Service dict for one Windows service from QueryServiceStatus/QueryServiceConfig."""
+        handle = win32service.OpenService(
+            self._scm, svc_name,
+            win32service.SERVICE_QUERY_STATUS | win32service.SERVICE_QUERY_CONFIG
+        )
+        try:
+            state = win32service.QueryServiceStatus(handle)[1]
+            config = win32service.QueryServiceConfig(handle)
+        finally:
+            win32service.CloseServiceHandle(handle)
+        status = _WINDOWS_STATUS.get(_WINDOWS_STATE_CODES.get(state), 'stopped')
+        return {
+            'name': svc_name,
+            'status': status,
+            'active': status == 'running',
+            'enabled': config[1] != _WINDOWS_START_DISABLED,
+            'description': config[8] or svc_name + ' service'
+        }
+
+    def _windows_service_status(self, svc_name: str):
+        """Current status of a Windows service from the SCM, or from 'sc query' without pywin32."""
+        if self._scm is not None:
+            try:
+                return self._get_windows_service_status_native(svc_name)['status']
+            except Exception as e:
+                logger.debug(f"QueryServiceStatus failed, using 'sc' instead: {e}")
+        result = subprocess.run([self._sc_path or 'sc', 'query', svc_name], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, errors='replace')
+        return _parse_sc_state(result.stdout)
+
     def _get_single_service_status(self, svc_name: str):
         """Return a uniform service dict for a single named service using best-effort checks."""
-        status = 'unknown'
-        active = False
-        enabled = False
+        return self._get_services_status_bulk([svc_name])[0]
+
+    def _get_services_status_bulk(self, svc_names):
+        """Return uniform service dicts for the named services.
+
+        Statuses fetched within the last _status_cache_ttl seconds are reused;
+        the rest are queried together with a single 'systemctl show'.
+        """
+        now = time.monotonic()
+        cached = {}
+        for name in svc_names:
+            entry = self._status_cache.get(name)
+            if entry is not None and entry[0] > now:
+                cached[name] = entry[1]
+        missing = [name for name in svc_names if name not in cached]
+        if missing:
+            expires_at = now + self._status_cache_ttl
+            for service in self._query_services_status(missing):
+                self._status_cache[service['name']] = (expires_at, service)
+                cached[service['name']] = service
+        return [cached[name] for name in svc_names]
+
+    def _invalidate_status(self, svc_name):
+        """Forget the cached status of a service whose state was just changed"""
+        self._status_cache.pop(svc_name, None)
+        self._unit_tables_cache = None
+
+    def _query_services_status(self, svc_names):
+        """Query the named services' status with a single 'systemctl show'.
+
+        Native APIs are preferred when available: the SCM on Windows and
+        systemd's D-Bus interface (pystemd) on Linux.
+        """
+        if self._scm is not None:
+            try:
+                return [self._get_windows_service_status_native(name) for name in svc_names]
+            except Exception as e:
+                logger.debug(f"QueryServiceStatus failed, using fallbacks: {e}")
+        units = None
+        if DBus is not None and self._system == 'Linux':
+            try:
+                units = self._systemd_call(_dbus_unit_properties, svc_names)
+            except Exception as e:
+                logger.debug(f"systemd D-Bus query failed, using systemctl instead: {e}")
         try:
-            if shutil.which('systemctl'):
-                result = subprocess.run(['systemctl', 'is-active', svc_name], capture_output=True, text=True, timeout=5)
-                raw = result.stdout.strip()
-                status = raw if result.returncode == 0 else 'stopped'
-                active = (raw in ('active', 'running'))
-                result2 = subprocess.run(['systemctl', 'is-enabled', svc_name], capture_output=True, text=True, timeout=5)
-                enabled = (result2.returncode == 0 and 'enabled' in result2.stdout)
+            if units is None and self._systemctl_path:
+                # systemctl prints one property block per unit, in the order requested
+                result = subprocess.run(
+                    [self._systemctl_path, 'show', f'--property={_SHOW_PROPERTIES}', '--'] + list(svc_names),
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, errors='replace', timeout=5, **_QUICK_SPAWN
+                )
+                if result.returncode == 0:
+                    units = _parse_systemctl_show(result.stdout)
+                    if len(units) != len(svc_names):
+                        units = None
+                else:
+                    units = [None] * len(svc_names)
         except Exception:
-            pass
+            units = None
+        if units is None:
+            units = [{}] * len(svc_names)
+        return [self._service_from_show(name, props) for name, props in zip(svc_names, units)]
+
+    @staticmethod
+    def _service_from_show(svc_name, props):
+        """Build a service dict from one unit's 'systemctl show' properties.
+
+        props is None when systemctl failed for the unit, and empty when
+        its state is unknown.
+        """
+        if props is None:
+            status, active, enabled = 'stopped', False, False
+        elif props:
+            status = _UNIT_STATUS.get(props.get('ActiveState'), 'stopped')
+            active = (status == 'running')
+            enabled = props.get('UnitFileState') in _ENABLED_STATES
+        else:
+            status, active, enabled = 'unknown', False, False
+        if props and props.get('LoadState') == 'loaded' and props.get('Description'):
+            description = props['Description']
+        else:
+            description = svc_name + ' service'
         return {
             'name': svc_name,
-            'status': 'running' if active else ('stopped' if status == 'stopped' else status or 'unknown'),
+            'status': status,
             'active': active,
             'enabled': enabled,
-            'description': f'{svc_name} service'
+            'description': description
         }
     
     def handle_service_action(self, request_handler):
         """Handle service control actions"""
+        self._refresh_tools()
         try:
             content_length = int(request_handler.headers.get('Content-Length', 0))
             if content_length > 0:
                 post_data = request_handler.rfile.read(content_length)
-                data = json.loads(post_data.decode('utf-8'))
+                data = json_loads(post_data)
                 
                 service_name = data.get('service_name', '')
                 action = data.get('action', '')
+                service_names = data.get('service_names')
                 
+                if service_names is not None:
+                    if (not isinstance(service_names, list) or not service_names
+                            or not all(isinstance(name, str) and name for name in service_names)):
+                        return {"success": False, "message": "service_names must be a non-empty list of service names"}
+                    if action not in _SERVICE_ACTIONS:
+                        return {"success": False, "message": f"Unknown action: {action}"}
+                    return self._handle_batch_service_action(service_names, action)
                 if action == 'status':
                     return {"success": True, "message": f"Service {service_name} status checked"}
-                elif action in ['start', 'stop', 'restart']:
+                elif action in _SERVICE_ACTIONS:
                     try:
                         # Resolve absolute paths to match sudoers rules
-                        systemctl_path = shutil.which('systemctl') or 'systemctl'
-                        service_path = shutil.which('service') or 'service'
-                        sudo_path = shutil.which('sudo')
+                        systemctl_path = self._systemctl_path or 'systemctl'
+                        service_path = self._service_path or 'service'
+                        sudo_path = self._sudo_path
 
-                        # Try plain systemctl first
-                        result = subprocess.run([systemctl_path, action, service_name], capture_output=True, text=True)
-                        if result.returncode == 0:
-                            return {"success": True, "message": f"Service {service_name} {action} successful"}
+                        # Try plain systemctl first, unless a recent action showed it needs sudo here
+                        skip_plain = sudo_path is not None and self._sudo_known_required()
+                        stderr = ''
+                        if not skip_plain:
+                            result = subprocess.run([systemctl_path, action, service_name], capture_output=True, text=True, errors='replace')
+                            if result.returncode == 0:
+                                self._remember_sudo(False)
+                                return {"success": True, "message": f"Service {service_name} {action} successful"}
+                            # Normalize systemctl's stderr once for both the auth check and the error message
+                            stderr = (result.stderr or '').strip()
 
                         # If we hit an auth error, try sudo non-interactively (requires sudoers NOPASSWD)
-                        stderr = (result.stderr or '').lower()
-                        if any(word in stderr for word in ['access denied', 'permission', 'authentication is required', 'not authorized', 'polkit']):
+                        if skip_plain or any(word in stderr.lower() for word in _AUTH_ERROR_WORDS):
                             if sudo_path:
-                                sudo_result = subprocess.run([sudo_path, '-n', systemctl_path, action, service_name], capture_output=True, text=True)
+                                sudo_result = subprocess.run([sudo_path, '-n', systemctl_path, action, service_name], capture_output=True, text=True, errors='replace')
                                 if sudo_result.returncode == 0:
+                                    self._remember_sudo(True)
                                     return {"success": True, "message": f"Service {service_name} {action} successful (sudo)"}
                                 else:
+                                    self._needs_sudo = None
                                     # Try sudo with service command as a fallback
                                     service_cmd = [sudo_path, '-n', service_path, service_name, action]
-                                    svc_result = subprocess.run(service_cmd, capture_output=True, text=True)
+                                    svc_result = subprocess.run(service_cmd, capture_output=True, text=True, errors='replace')
                                     if svc_result.returncode == 0:
                                         return {"success": True, "message": f"Service {service_name} {action} successful via 'service' (sudo)"}
                                     # Return combined stderr for diagnostics
@@ -207,12 +746,14 @@ class ServiceManager:
                         # If alternative failed, include original stderr for context
                         if not alt.get('success'):
                             alt_msg = alt.get('message') or alt.get('error') or 'unknown error'
-                            return {"success": False, "message": f"Service control failed: {alt_msg}. systemctl stderr: {(result.stderr or '').strip()}"}
+                            return {"success": False, "message": f"Service control failed: {alt_msg}. systemctl stderr: {stderr}"}
                         return alt
                     except FileNotFoundError:
                         return self._handle_service_action_alternative(service_name, action)
                     except Exception as e:
                         return {"success": False, "message": f"Service control failed: {str(e)}"}
+                    finally:
+                        self._invalidate_status(service_name)
                 else:
                     return {"success": False, "message": f"Unknown action: {action}"}
             else:
@@ -221,77 +762,139 @@ class ServiceManager:
             logger.error(f"Service action failed: {e}")
             return {"success": False, "message": f"Service action failed: {str(e)}"}
     
+    def _handle_batch_service_action(self, service_names, action):
+        """Start, stop or restart several services with one systemctl call"""
+        if not service_names:
+            return {"success": False, "message": "No services given"}
+        if not self._systemctl_path:
+            results = []
+            for name in service_names:
+                outcome = self._handle_service_action_alternative(name, action)
+                results.append({"name": name, "ok": bool(outcome.get('success'))})
+            return {"success": all(r['ok'] for r in results), "results": results,
+                    "message": f"Services {action} via alternative methods"}
+
+        cmd = [self._systemctl_path, action, '--'] + service_names
+        try:
+            skip_plain = self._sudo_path is not None and self._sudo_known_required()
+            result = None
+            if not skip_plain:
+                result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors='replace')
+                stderr = (result.stderr or '').strip()
+                if result.returncode == 0:
+                    self._remember_sudo(False)
+            if skip_plain or (result.returncode != 0 and self._sudo_path
+                              and any(word in stderr.lower() for word in _AUTH_ERROR_WORDS)):
+                result = subprocess.run([self._sudo_path, '-n'] + cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                        text=True, errors='replace')
+                stderr = (result.stderr or '').strip()
+                if result.returncode == 0:
+                    self._remember_sudo(True)
+                else:
+                    self._needs_sudo = None
+            if result.returncode == 0:
+                results = [{"name": name, "ok": True} for name in service_names]
+            else:
+                # One failing unit fails the whole call; ask which units reached the requested state
+                states = subprocess.run(
+                    [self._systemctl_path, 'is-active', '--'] + service_names,
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, errors='replace', timeout=5, **_QUICK_SPAWN
+                ).stdout.split()
+                if len(states) != len(service_names):
+                    states = [''] * len(service_names)
+                want_active = action != 'stop'
+                results = [{"name": name, "ok": (state == 'active') == want_active}
+                           for name, state in zip(service_names, states)]
+        except Exception as e:
+            return {"success": False, "message": f"Service control failed: {str(e)}"}
+        finally:
+            for name in service_names:
+                self._invalidate_status(name)
+
+        success = all(r['ok'] for r in results)
+        message = f"Services {action} successful" if success else f"Service control failed: {stderr}"
+        return {"success": success, "results": results, "message": message}
+    
     def restart_service(self):
         """Safely restart the pi-monitor service"""
+        self._refresh_tools()
         try:
             logger.info("🔄 Attempting safe restart of pi-monitor service...")
+            # Only tools found on PATH are tried; report exactly those
+            methods_tried = []
             
             # Method 1: Try systemctl first (most reliable)
-            try:
-                logger.info("  🔧 Trying systemctl restart...")
-                result = subprocess.run(['systemctl', 'restart', 'pi-monitor'], 
-                                      capture_output=True, text=True, timeout=30)
-                if result.returncode == 0:
-                    logger.info("  ✅ systemctl restart successful")
-                    return {
-                        'success': True,
-                        'message': 'Pi-monitor service restarted successfully using systemctl',
-                        'method': 'systemctl',
-                        'command_used': 'systemctl restart pi-monitor',
-                        'safety_level': 'high',
-                        'description': 'Service restart only - no system impact'
-                    }
-                else:
-                    logger.info(f"  ❌ systemctl restart failed: {result.stderr}")
-            except Exception as e:
-                logger.info(f"  ❌ systemctl restart exception: {str(e)}")
+            if self._systemctl_path:
+                methods_tried.append('systemctl')
+                try:
+                    logger.info("  🔧 Trying systemctl restart...")
+                    result = subprocess.run([self._systemctl_path, 'restart', 'pi-monitor'], 
+                                          capture_output=True, text=True, errors='replace', timeout=30, **_QUICK_SPAWN)
+                    if result.returncode == 0:
+                        logger.info("  ✅ systemctl restart successful")
+                        return {
+                            'success': True,
+                            'message': 'Pi-monitor service restarted successfully using systemctl',
+                            'method': 'systemctl',
+                            'command_used': 'systemctl restart pi-monitor',
+                            'safety_level': 'high',
+                            'description': 'Service restart only - no system impact'
+                        }
+                    else:
+                        logger.info(f"  ❌ systemctl restart failed: {result.stderr}")
+                except Exception as e:
+                    logger.info(f"  ❌ systemctl restart exception: {str(e)}")
             
             # Method 2: Try service command (fallback)
-            try:
-                logger.info("  🔧 Trying service restart...")
-                result = subprocess.run(['service', 'pi-monitor', 'restart'], 
-                                      capture_output=True, text=True, timeout=30)
-                if result.returncode == 0:
-                    logger.info("  ✅ service restart successful")
-                    return {
-                        'success': True,
-                        'message': 'Pi-monitor service restarted successfully using service command',
-                        'method': 'service',
-                        'command_used': 'service pi-monitor restart',
-                        'safety_level': 'high',
-                        'description': 'Service restart only - no system impact'
-                    }
-                else:
-                    logger.info(f"  ❌ service restart failed: {result.stderr}")
-            except Exception as e:
-                logger.info(f"  ❌ service restart exception: {str(e)}")
+            if self._service_path:
+                methods_tried.append('service')
+                try:
+                    logger.info("  🔧 Trying service restart...")
+                    result = subprocess.run([self._service_path, 'pi-monitor', 'restart'], 
+                                          capture_output=True, text=True, errors='replace', timeout=30, **_QUICK_SPAWN)
+                    if result.returncode == 0:
+                        logger.info("  ✅ service restart successful")
+                        return {
+                            'success': True,
+                            'message': 'Pi-monitor service restarted successfully using service command',
+                            'method': 'service',
+                            'command_used': 'service pi-monitor restart',
+                            'safety_level': 'high',
+                            'description': 'Service restart only - no system impact'
+                        }
+                    else:
+                        logger.info(f"  ❌ service restart failed: {result.stderr}")
+                except Exception as e:
+                    logger.info(f"  ❌ service restart exception: {str(e)}")
             
             # Method 3: Try Docker restart if running in container
-            try:
-                logger.info("  🔧 Trying Docker restart...")
-                result = subprocess.run(['docker', 'restart', 'pi-monitor'], 
-                                      capture_output=True, text=True, timeout=30)
-                if result.returncode == 0:
-                    logger.info("  ✅ Docker restart successful")
-                    return {
-                        'success': True,
-                        'message': 'Pi-monitor container restarted successfully using Docker',
-                        'method': 'docker',
-                        'command_used': 'docker restart pi-monitor',
-                        'safety_level': 'high',
-                        'description': 'Container restart only - no system impact'
-                    }
-                else:
-                    logger.info(f"  ❌ Docker restart failed: {result.stderr}")
-            except Exception as e:
-                logger.info(f"  ❌ Docker restart exception: {str(e)}")
+            if self._docker_path:
+                methods_tried.append('docker')
+                try:
+                    logger.info("  🔧 Trying Docker restart...")
+                    result = subprocess.run([self._docker_path, 'restart', 'pi-monitor'], 
+                                          capture_output=True, text=True, errors='replace', timeout=30, **_QUICK_SPAWN)
+                    if result.returncode == 0:
+                        logger.info("  ✅ Docker restart successful")
+                        return {
+                            'success': True,
+                            'message': 'Pi-monitor container restarted successfully using Docker',
+                            'method': 'docker',
+                            'command_used': 'docker restart pi-monitor',
+                            'safety_level': 'high',
+                            'description': 'Container restart only - no system impact'
+                        }
+                    else:
+                        logger.info(f"  ❌ Docker restart failed: {result.stderr}")
+                except Exception as e:
+                    logger.info(f"  ❌ Docker restart exception: {str(e)}")
             
             # If all methods failed
             logger.error("  ❌ All safe restart methods failed")
             return {
                 'success': False,
                 'error': 'All safe restart methods failed',
-                'methods_tried': ['systemctl', 'service', 'docker'],
+                'methods_tried': methods_tried,
                 'suggestions': [
                     'Check if pi-monitor service is properly configured',
                     'Verify systemctl/service commands are available',
@@ -317,17 +920,20 @@ class ServiceManager:
             content_length = int(request_handler.headers.get('Content-Length', 0))
             if content_length > 0:
                 post_data = request_handler.rfile.read(content_length)
-                data = json.loads(post_data.decode('utf-8'))
+                data = json_loads(post_data)
                 action = data.get('action', 'status')
             else:
                 action = 'status'
             
             logger.info(f"🔧 Attempting {action} of pi-monitor service...")
+            # Absolute path when resolved, so the command is spawned without a PATH search
+            self._refresh_tools()
+            systemctl_path = self._systemctl_path or 'systemctl'
             
             if action == 'start':
                 try:
-                    result = subprocess.run(['systemctl', 'start', 'pi-monitor'], 
-                                          capture_output=True, text=True, timeout=30)
+                    result = subprocess.run([systemctl_path, 'start', 'pi-monitor'], 
+                                          capture_output=True, text=True, errors='replace', timeout=30, **_QUICK_SPAWN)
                     if result.returncode == 0:
                         return {
                             'success': True,
@@ -347,11 +953,13 @@ class ServiceManager:
                         'error': f'Exception starting service: {str(e)}',
                         'action': 'start'
                     }
+                finally:
+                    self._invalidate_status('pi-monitor')
                     
             elif action == 'stop':
                 try:
-                    result = subprocess.run(['systemctl', 'stop', 'pi-monitor'], 
-                                          capture_output=True, text=True, timeout=30)
+                    result = subprocess.run([systemctl_path, 'stop', 'pi-monitor'], 
+                                          capture_output=True, text=True, errors='replace', timeout=30, **_QUICK_SPAWN)
                     if result.returncode == 0:
                         return {
                             'success': True,
@@ -371,16 +979,31 @@ class ServiceManager:
                         'error': f'Exception stopping service: {str(e)}',
                         'action': 'stop'
                     }
+                finally:
+                    self._invalidate_status('pi-monitor')
                     
             elif action == 'status':
+                detailed_proc = None
                 try:
-                    result = subprocess.run(['systemctl', 'is-active', 'pi-monitor'], 
-                                          capture_output=True, text=True, timeout=10)
-                    status = result.stdout.strip() if result.returncode == 0 else 'unknown'
+                    # Start the detailed status alongside is-active instead of after it
+                    detailed_proc = subprocess.Popen([systemctl_path, 'status', 'pi-monitor', '--no-pager'],
+                                                     stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, errors='replace', **_QUICK_SPAWN)
+                    status = None
+                    if DBus is not None:
+                        # ActiveState straight from systemd instead of forking 'systemctl is-active'
+                        try:
+                            state = self._systemd_call(_dbus_unit_properties, ['pi-monitor'])[0]['ActiveState']
+                            # Report what the systemctl path below does: is-active only succeeds when active or reloading
+                            status = state if state in ('active', 'reloading') else 'unknown'
+                        except Exception as e:
+                            logger.debug(f"systemd D-Bus query failed, using systemctl instead: {e}")
+                    if status is None:
+                        result = subprocess.run([systemctl_path, 'is-active', 'pi-monitor'], 
+                                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, errors='replace', timeout=10, **_QUICK_SPAWN)
+                        status = result.stdout.strip() if result.returncode == 0 else 'unknown'
                     
-                    detailed_result = subprocess.run(['systemctl', 'status', 'pi-monitor', '--no-pager'], 
-                                                  capture_output=True, text=True, timeout=15)
-                    detailed_status = detailed_result.stdout if detailed_result.returncode == 0 else 'Status unavailable'
+                    detailed_stdout, _ = detailed_proc.communicate(timeout=15)
+                    detailed_status = detailed_stdout if detailed_proc.returncode == 0 else 'Status unavailable'
                     
                     return {
                         'success': True,
@@ -389,6 +1012,9 @@ class ServiceManager:
                         'action': 'status'
                     }
                 except Exception as e:
+                    if detailed_proc is not None and detailed_proc.poll() is None:
+                        detailed_proc.kill()
+                        detailed_proc.wait()
                     return {
                         'success': False,
                         'error': f'Exception checking status: {str(e)}',
@@ -410,53 +1036,12 @@ class ServiceManager:
             }
     
     def get_restart_info(self):
-        """Get service restart information"""
-        return {
-            "endpoint": "/api/service/restart",
-            "description": "Safe service restart endpoint",
-            "methods": {
-                "GET": "Get endpoint information",
-                "POST": "Execute safe service restart"
-            },
-            "safety_features": [
-                "No system shutdown/restart",
-                "Service restart only",
-                "Multiple fallback methods",
-                "Graceful process handling"
-            ],
-            "available_methods": [
-                "systemctl restart",
-                "service restart", 
-                "docker restart"
-            ],
-            "usage": {
-                "method": "POST",
-                "headers": "Authorization: Bearer <token>",
-                "body": "{} (no body required)"
-            }
-        }
+        """Get service restart information (a fresh copy; the shared constant stays untouched)"""
+        return json_loads(RESTART_INFO_JSON)
     
     def get_manage_info(self):
-        """Get service management information"""
-        return {
-            "endpoint": "/api/service/manage",
-            "description": "Service management endpoint",
-            "methods": {
-                "GET": "Get endpoint information",
-                "POST": "Execute service management actions"
-            },
-            "available_actions": ["start", "stop", "status"],
-            "safety_features": [
-                "Service-level operations only",
-                "No system impact",
-                "Standard systemctl/service commands"
-            ],
-            "usage": {
-                "method": "POST",
-                "headers": "Authorization: Bearer <token>",
-                "body": '{"action": "start|stop|status"}'
-            }
-        }
+        """Get service management information (a fresh copy; the shared constant stays untouched)"""
+        return json_loads(MANAGE_INFO_JSON)
     
     def get_service_info(self):
         """Get service management information"""
@@ -479,6 +1064,7 @@ class ServiceManager:
     
     def _get_service_management_info(self):
         """Get information about available service management methods"""
+        self._refresh_tools()
         try:
             info = {
                 'available_methods': [],
@@ -488,38 +1074,13 @@ class ServiceManager:
                 'recommendations': []
             }
             
-            # Check systemctl availability
-            try:
-                result = subprocess.run(['systemctl', '--version'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    info['systemctl_available'] = True
-                    info['available_methods'].append('systemctl')
-                    info['recommendations'].append('Use systemctl for service management (most reliable)')
-            except:
-                pass
-            
-            # Check service command availability
-            try:
-                result = subprocess.run(['service', '--help'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    info['service_available'] = True
-                    info['available_methods'].append('service')
-                    info['recommendations'].append('Use service command as fallback')
-            except:
-                pass
-            
-            # Check Docker availability
-            try:
-                result = subprocess.run(['docker', '--version'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    info['docker_available'] = True
-                    info['available_methods'].append('docker')
-                    info['recommendations'].append('Use Docker commands if running in container')
-            except:
-                pass
+            # A tool on PATH counts as available; no need to spawn it to find out
+            tool_paths = {'systemctl': self._systemctl_path, 'service': self._service_path, 'docker': self._docker_path}
+            for name, recommendation in _MANAGEMENT_TOOLS:
+                if tool_paths[name]:
+                    info[f'{name}_available'] = True
+                    info['available_methods'].append(name)
+                    info['recommendations'].append(recommendation)
             
             # Add safety recommendations
             info['safety_recommendations'] = [
@@ -539,39 +1100,41 @@ class ServiceManager:
     def _handle_service_action_alternative(self, service_name, action):
         """Handle service actions using alternative methods when systemctl is not available"""
         try:
-            if platform.system() == 'Windows':
+            if self._system == 'Windows':
                 # Windows service control using sc command
+                sc_path = self._sc_path or 'sc'
                 if action == 'start':
-                    result = subprocess.run(['sc', 'start', service_name], capture_output=True, text=True, shell=True)
+                    result = subprocess.run([sc_path, 'start', service_name], capture_output=True, text=True, errors='replace')
                     if result.returncode == 0:
                         return {"success": True, "message": f"Service {service_name} started successfully using sc command"}
                     else:
                         return {"success": False, "message": f"Service {service_name} start failed: {result.stderr}"}
                 elif action == 'stop':
-                    result = subprocess.run(['sc', 'stop', service_name], capture_output=True, text=True, shell=True)
+                    result = subprocess.run([sc_path, 'stop', service_name], capture_output=True, text=True, errors='replace')
                     if result.returncode == 0:
                         return {"success": True, "message": f"Service {service_name} stopped successfully using sc command"}
                     else:
                         return {"success": False, "message": f"Service {service_name} stop failed: {result.stderr}"}
                 elif action == 'restart':
-                    stop_result = subprocess.run(['sc', 'stop', service_name], capture_output=True, text=True, shell=True)
-                    time.sleep(2)  # Wait a bit
-                    start_result = subprocess.run(['sc', 'start', service_name], capture_output=True, text=True, shell=True)
+                    stop_result = subprocess.run([sc_path, 'stop', service_name], capture_output=True, text=True, errors='replace')
+                    # Start again as soon as the stop has finished, for at most 10 seconds;
+                    # a rejected stop (e.g. the service was not running) needs no wait
+                    if stop_result.returncode == 0:
+                        deadline = time.monotonic() + 10
+                        while self._windows_service_status(service_name) != 'stopped' and time.monotonic() < deadline:
+                            time.sleep(0.1)
+                    start_result = subprocess.run([sc_path, 'start', service_name], capture_output=True, text=True, errors='replace')
                     if start_result.returncode == 0:
                         return {"success": True, "message": f"Service {service_name} restarted successfully using sc command"}
                     else:
                         return {"success": False, "message": f"Service {service_name} restart failed: {start_result.stderr}"}
                 elif action == 'status':
-                    result = subprocess.run(['sc', 'query', service_name], capture_output=True, text=True, shell=True)
-                    if 'RUNNING' in result.stdout:
-                        return {"success": True, "service": service_name, "status": "running"}
-                    else:
-                        return {"success": True, "service": service_name, "status": "stopped"}
+                    return {"success": True, "service": service_name, "status": self._windows_service_status(service_name)}
             else:
                 # Linux service control using service command
                 if service_name in ['ssh', 'nginx', 'docker']:
                     try:
-                        result = subprocess.run(['service', service_name, action], capture_output=True, text=True)
+                        result = subprocess.run([self._service_path or 'service', service_name, action], capture_output=True, text=True, errors='replace')
                         if result.returncode == 0:
                             return {"success": True, "message": f"{service_name} service {action} using service command"}
                         else:
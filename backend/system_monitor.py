@@ -5,10 +5,20 @@ Handles system information gathering and monitoring
 """
 
 import time
+import socket
+import struct
 import platform
 import logging
 from collections import deque
 
+from utils import (
+    VCGENCMD_TEMP_RE as _TEMP_RE,
+    VCGENCMD_CORE_VOLT_RE as _CORE_VOLT_RE,
+    VCGENCMD_CORE_CURRENT_RE as _CORE_CURRENT_RE,
+    VCGENCMD_VOLT_RE as _VOLT_RE,
+    VCGENCMD_OVER_VOLTAGE_RE as _OVER_VOLTAGE_RE,
+)
+
 # Handle psutil import gracefully
 try:
     import psutil
@@ -366,18 +376,23 @@ class SystemMonitor:
             except Exception:
                 pass
             
-            # Gateway/route
-            try:
-                import subprocess
-                result = subprocess.run(['ip', 'route'], capture_output=True, text=True, timeout=3)
-                if result.returncode == 0:
-                    for line in result.stdout.splitlines():
-                        if line.startswith('default via'):
-                            gateway = line.split()[2]
-                            route_status = 'ok'
-                            break
-            except Exception:
-                pass
+            # Gateway/route: read the kernel routing table directly; fall back to 'ip route'
+            # when it is unreadable (non-Linux) or lists no IPv4 default route
+            gateway = self._read_default_gateway()
+            if gateway is not None:
+                route_status = 'ok'
+            else:
+                try:
+                    import subprocess
+                    result = subprocess.run(['ip', 'route'], capture_output=True, text=True, timeout=3)
+                    if result.returncode == 0:
+                        for line in result.stdout.splitlines():
+                            if line.startswith('default via'):
+                                gateway = line.split()[2]
+                                route_status = 'ok'
+                                break
+                except Exception:
+                    pass
                 
         except Exception as e:
             logger.error(f"Failed to get network info: {e}")
@@ -390,6 +405,28 @@ class SystemMonitor:
             'routeStatus': route_status
         }
     
+    @staticmethod
+    def _read_default_gateway(route_table='/proc/net/route'):
+        """Return the IPv4 default gateway from /proc/net/route, or None if unavailable"""
+        try:
+            best = None
+            with open(route_table, 'r') as f:
+                next(f, None)  # header
+                for line in f:
+                    fields = line.split()
+                    # Iface Destination Gateway Flags RefCnt Use Metric ...; RTF_UP | RTF_GATEWAY
+                    if len(fields) < 7 or fields[1] != '00000000' or int(fields[3], 16) & 0x3 != 0x3:
+                        continue
+                    metric = int(fields[6])
+                    if best is None or metric < best[0]:
+                        best = (metric, fields[2])
+            if best is None:
+                return None
+            # Gateway is a host-order (little-endian) hex IPv4 address
+            return socket.inet_ntoa(struct.pack('<L', int(best[1], 16)))
+        except (OSError, ValueError):
+            return None
+    
     def get_network_stats(self):
         """Return instantaneous upload/download speeds per interface and totals"""
         try:
@@ -454,8 +491,7 @@ class SystemMonitor:
                 import subprocess
                 result = subprocess.run(['vcgencmd', 'measure_temp'], capture_output=True, text=True, timeout=5)
                 if result.returncode == 0:
-                    import re
-                    temp_match = re.search(r'temp=(\d+\.?\d*)', result.stdout)
+                    temp_match = _TEMP_RE.search(result.stdout)
                     if temp_match:
                         temp_value = float(temp_match.group(1))
                         if temp_value > 0 and temp_value < 200:  # Sanity check
@@ -480,16 +516,15 @@ class SystemMonitor:
                 import subprocess
                 result = subprocess.run(['vcgencmd', 'pmic_read_adc'], capture_output=True, text=True, timeout=5)
                 if result.returncode == 0:
-                    import re
                     # Look for VDD_CORE_V voltage reading
-                    voltage_match = re.search(r'VDD_CORE_V volt\(15\)=(\d+\.?\d*)V', result.stdout)
+                    voltage_match = _CORE_VOLT_RE.search(result.stdout)
                     if voltage_match:
                         voltage_value = float(voltage_match.group(1))
                         if voltage_value > 0 and voltage_value < 2.0:  # Sanity check for core voltage
                             voltage_value = round(voltage_value, 3)
                     
                     # Look for VDD_CORE_A current reading
-                    current_match = re.search(r'VDD_CORE_A current\(7\)=(\d+\.?\d*)A', result.stdout)
+                    current_match = _CORE_CURRENT_RE.search(result.stdout)
                     if current_match:
                         current_value = float(current_match.group(1))
                         if current_value > 0 and current_value < 10:  # Sanity check for core current
@@ -503,8 +538,7 @@ class SystemMonitor:
                     import subprocess
                     result = subprocess.run(['vcgencmd', 'measure_volts', 'core'], capture_output=True, text=True, timeout=5)
                     if result.returncode == 0:
-                        import re
-                        voltage_match = re.search(r'volt=(\d+\.?\d*)', result.stdout)
+                        voltage_match = _VOLT_RE.search(result.stdout)
                         if voltage_match:
                             voltage_value = float(voltage_match.group(1))
                             if voltage_value > 0 and voltage_value < 2.0:  # Sanity check
@@ -518,9 +552,8 @@ class SystemMonitor:
                     import subprocess
                     result = subprocess.run(['vcgencmd', 'get_config', 'int'], capture_output=True, text=True, timeout=5)
                     if result.returncode == 0:
-                        import re
                         # Look for voltage-related config values
-                        voltage_match = re.search(r'over_voltage=(\d+)', result.stdout)
+                        voltage_match = _OVER_VOLTAGE_RE.search(result.stdout)
                         if voltage_match:
                             # This is overvoltage setting, not actual voltage, but can be used as fallback
                             overvoltage = int(voltage_match.group(1))
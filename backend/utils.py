@@ -4,42 +4,81 @@ Pi Monitor - Utilities
 Common utility functions and decorators
 """
 
+import re
 import time
 import logging
 import json
-from collections import defaultdict
+import threading
+from collections import OrderedDict
 from functools import wraps
 
 logger = logging.getLogger(__name__)
 
-def rate_limit(max_requests=100, window=60):
-    """Rate limiting decorator"""
+# vcgencmd output patterns, compiled once for the per-sample temperature/voltage reads
+# (shared by metrics and system_monitor)
+VCGENCMD_TEMP_RE = re.compile(r'temp=(\d+\.?\d*)')
+VCGENCMD_CORE_VOLT_RE = re.compile(r'VDD_CORE_V volt\(15\)=(\d+\.?\d*)V')
+VCGENCMD_CORE_CURRENT_RE = re.compile(r'VDD_CORE_A current\(7\)=(\d+\.?\d*)A')
+VCGENCMD_VOLT_RE = re.compile(r'volt=(\d+\.?\d*)')
+VCGENCMD_OVER_VOLTAGE_RE = re.compile(r'over_voltage=(\d+)')
+
+# Fast JSON encoding/decoding (falls back to stdlib json); both work on bytes
+try:
+    import orjson
+    
+    def json_dumps(obj):
+        """Serialize obj to UTF-8 JSON bytes"""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    
+    json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    
+    def json_dumps(obj):
+        """Serialize obj to UTF-8 JSON bytes"""
+        return json.dumps(obj).encode()
+    
+    def json_loads(data):
+        """Parse JSON from bytes or str"""
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+def rate_limit(max_requests=100, window=60, max_clients=10000):
+    """Rate limiting decorator (per-IP token bucket refilled at max_requests per window)"""
     def decorator(func):
-        request_counts = defaultdict(list)
+        # client_ip -> (tokens, last_refill), least recently seen first
+        buckets = OrderedDict()
+        lock = threading.Lock()
+        refill_rate = max_requests / float(window)
         
         @wraps(func)
         def wrapper(self, *args, **kwargs):
             try:
                 client_ip = getattr(self, 'client_address', ['unknown'])[0]
-                now = time.time()
+                now = time.monotonic()
                 
-                # Clean old requests
-                request_counts[client_ip] = [req_time for req_time in request_counts[client_ip] 
-                                           if now - req_time < window]
+                with lock:
+                    tokens, last = buckets.get(client_ip, (max_requests, now))
+                    tokens = min(max_requests, tokens + (now - last) * refill_rate)
+                    allowed = tokens >= 1
+                    buckets[client_ip] = (tokens - 1 if allowed else tokens, now)
+                    buckets.move_to_end(client_ip)
+                    if len(buckets) > max_clients:
+                        buckets.popitem(last=False)
                 
                 # Check rate limit
-                if len(request_counts[client_ip]) >= max_requests:
+                if not allowed:
+                    response = {"error": "Rate limit exceeded", "retry_after": window}
+                    body = json_dumps(response)
                     self.send_response(429)
                     self.send_header('Content-type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
                     self.send_header('Retry-After', str(window))
                     self.end_headers()
-                    response = {"error": "Rate limit exceeded", "retry_after": window}
-                    self.wfile.write(json.dumps(response).encode())
+                    self.wfile.write(body)
                     return
                 
-                # Add current request
-                request_counts[client_ip].append(now)
-                
                 return func(self, *args, **kwargs)
             except Exception as e:
                 # If rate limiting fails, just execute the function
@@ -48,6 +87,16 @@ def rate_limit(max_requests=100, window=60):
         return wrapper
     return decorator
 
+def require_auth(func):
+    """Reject the request with 401 unless the handler's auth check passes"""
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not self._check_auth():
+            self._send_unauthorized()
+            return
+        return func(self, *args, **kwargs)
+    return wrapper
+
 def monitor_performance(func):
     """Monitor function performance"""
     @wraps(func)
@@ -63,3 +112,51 @@ def monitor_performance(func):
             logger.error(f"{func.__name__} failed after {execution_time:.3f}s: {e}")
             raise
     return wrapper
+
+class ResponseCache:
+    """Thread-safe TTL cache of encoded response bodies with LFU eviction"""
+    
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = {}  # key -> [expires_at, value, hits]
+        self._lock = threading.Lock()
+    
+    def get_or_build(self, key, ttl, build):
+        """Return (value, stale) for key, calling build() when it is missing or expired.
+        
+        If build() raises and an expired value is still held, that stale value
+        is returned with stale=True instead of failing the request.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            fresh = entry is not None and entry[0] > time.monotonic()
+            if fresh:
+                # Only fresh hits count towards LFU; expired lookups rebuild below
+                entry[2] += 1
+        if fresh:
+            return entry[1], False
+        
+        try:
+            value = build()
+        except Exception as e:
+            if entry is None:
+                raise
+            logger.warning(f"Serving stale response for {key}: {e}")
+            return entry[1], True
+        
+        now = time.monotonic()
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                if len(self._entries) >= self.max_entries:
+                    # Evict the least frequently used entry rather than dropping everything
+                    del self._entries[min(self._entries, key=lambda k: self._entries[k][2])]
+            # Keep the hit count across refreshes so hot keys stay resident
+            hits = entry[2] if entry is not None else 1
+            self._entries[key] = [now + ttl, value, hits]
+        return value, False
+    
+    def clear(self):
+        """Drop all cached responses"""
+        with self._lock:
+            self._entries.clear()
@@ -9,6 +9,8 @@ import json
 import base64
 import hashlib
 import logging
+import time
+from collections import namedtuple
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 import jwt
@@ -35,6 +37,9 @@ from config import config
 
 logger = logging.getLogger(__name__)
 
+# Client details recorded with a new session
+RequestInfo = namedtuple('RequestInfo', 'user_agent ip_address')
+
 class WebAuthnManager:
     """Manages WebAuthn (passkey) authentication"""
     
@@ -149,10 +154,11 @@ class WebAuthnManager:
     
     def generate_jwt_token(self, user_id: str, expires_hours: int = 24) -> str:
         """Generate JWT token for user session"""
+        now = int(time.time())
         payload = {
             'user_id': user_id,
-            'exp': datetime.utcnow() + timedelta(hours=expires_hours),
-            'iat': datetime.utcnow(),
+            'exp': now + expires_hours * 3600,
+            'iat': now,
             'iss': 'pi-monitor'
         }
         return jwt.encode(payload, self.jwt_secret, algorithm='HS256')
@@ -420,8 +426,11 @@ class WebAuthnManager:
             return {'error': str(e)}
     
     def verify_authentication(self, credential: Dict[str, Any], challenge_key: str,
-                             request_info: Dict[str, Any] = None) -> Dict[str, Any]:
+                             request_info: Optional[RequestInfo] = None) -> Dict[str, Any]:
         """Verify WebAuthn authentication response"""
+        if isinstance(request_info, dict):
+            # Accept the older dict form as well
+            request_info = RequestInfo(request_info.get('user_agent'), request_info.get('ip_address'))
         try:
             # Get stored challenge
             expected_challenge = self._get_challenge(challenge_key)
@@ -485,8 +494,8 @@ class WebAuthnManager:
                     user_id=user['id'],
                     token_hash=token_hash,
                     expires_at=expires_at,
-                    user_agent=request_info.get('user_agent') if request_info else None,
-                    ip_address=request_info.get('ip_address') if request_info else None
+                    user_agent=request_info.user_agent if request_info else None,
+                    ip_address=request_info.ip_address if request_info else None
                 )
                 
                 # Clean up challenge
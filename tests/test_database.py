@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Pi Monitor - Database tests
+SQLite-encoded metrics history against the Python formatter
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import metrics
+from database import MetricsDatabase
+from metrics import MetricsCollector
+from utils import json_dumps
+
+
+class TestMetricsHistoryJSON(unittest.TestCase):
+    """Test that get_metrics_history_json matches the Python-built history"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = MetricsDatabase(os.path.join(self.temp_dir.name, 'metrics.db'))
+        self.db_patcher = patch.object(metrics, '_shared_db', self.db)
+        self.db_patcher.start()
+        self.collector = MetricsCollector()
+
+        now = time.time()
+        rows = [
+            # Full-precision timestamp, whole-number floats and large counters
+            (now - 120.123456789, 12.5, 40.0, 18.1, 51.2, 0.85, 1.2,
+             123456789012, 987654321098, 1000, 2000, 4096, 8192, 10, 20),
+            # NULL sensors and counters (e.g. vcgencmd or psutil unavailable)
+            (now - 60.5, 3.0, 41.25, 18.1, None, None, None,
+             None, None, None, None, None, None, None, None),
+            (now - 1, 0.0, 0.0, 0.0, 0.0, 0.7, None,
+             0, 0, 0, 0, 0, 0, 0, 0),
+        ]
+        with sqlite3.connect(self.db.db_path) as conn:
+            conn.executemany('''
+                INSERT INTO metrics (timestamp, cpu_percent, memory_percent, disk_percent, temperature, voltage,
+                                     core_current, network_bytes_sent, network_bytes_recv, network_packets_sent,
+                                     network_packets_recv, disk_read_bytes, disk_write_bytes, disk_read_count,
+                                     disk_write_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+
+    def tearDown(self):
+        self.db_patcher.stop()
+        self.temp_dir.cleanup()
+
+    def assert_same_history(self, include_date):
+        encoded = self.collector.get_metrics_history_formatted_json(self.db, 60, include_date)
+        expected = json_dumps(self.collector.get_metrics_history_formatted(60, include_date))
+        self.assertEqual(json.loads(encoded), json.loads(expected))
+
+    def test_matches_python_formatter(self):
+        """SQL and Python paths produce the same rows, including NULL columns"""
+        self.assert_same_history(include_date=True)
+
+    def test_matches_python_formatter_time_only(self):
+        """formatted_time without the date matches too"""
+        self.assert_same_history(include_date=False)
+
+    def test_rows_ascending_with_nulls(self):
+        """Rows come back oldest first and NULL columns are JSON null"""
+        count, body = self.db.get_metrics_history_json(60)
+        rows = json.loads(body)
+        self.assertEqual(count, 3)
+        self.assertEqual([r['timestamp'] for r in rows], sorted(r['timestamp'] for r in rows))
+        self.assertIsNone(rows[1]['temperature'])
+        self.assertIsNone(rows[1]['network']['bytes_sent'])
+        self.assertIsNone(rows[1]['disk_io']['write_count'])
+
+    def test_empty_window(self):
+        """No rows in the window returns None so callers use the fallback path"""
+        empty = MetricsDatabase(os.path.join(self.temp_dir.name, 'empty.db'))
+        self.assertIsNone(empty.get_metrics_history_json(60))
+
+
+if __name__ == '__main__':
+    unittest.main()
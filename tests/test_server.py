@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Pi Monitor - HTTP server tests
+JWT verification cache and request handling edge cases
+"""
+
+import io
+import os
+import sys
+import json
+import threading
+import unittest
+from collections import OrderedDict
+from unittest.mock import Mock, patch
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import server
+from server import PiMonitorServer, PiMonitorHandler
+from utils import ResponseCache
+
+
+def make_server(webauthn_manager):
+    """PiMonitorServer with only the JWT cache state set up (no background threads)"""
+    instance = PiMonitorServer.__new__(PiMonitorServer)
+    instance.webauthn_manager = webauthn_manager
+    instance._jwt_cache = OrderedDict()
+    instance._jwt_cache_lock = threading.Lock()
+    instance._jwt_cache_epoch = 0
+    instance._auth_status_cache = (0.0, None)
+    return instance
+
+
+class TestJWTCache(unittest.TestCase):
+    """Test the verified-JWT cache in PiMonitorServer"""
+
+    def setUp(self):
+        self.wm = Mock()
+        self.wm.verify_jwt_token.side_effect = lambda token: {'user_id': token, 'exp': 10 ** 10}
+        self.server = make_server(self.wm)
+
+    def test_cache_hit_skips_verification(self):
+        """A cached token is not verified again"""
+        self.assertEqual(self.server.verify_jwt_token('a')['user_id'], 'a')
+        self.assertEqual(self.server.verify_jwt_token('a')['user_id'], 'a')
+        self.assertEqual(self.wm.verify_jwt_token.call_count, 1)
+
+    def test_entry_expires_after_ttl(self):
+        """Entries are re-verified once _JWT_CACHE_TTL has passed"""
+        with patch.object(server, '_time', return_value=1000.0):
+            self.server.verify_jwt_token('a')
+        with patch.object(server, '_time', return_value=1000.0 + server._JWT_CACHE_TTL - 1):
+            self.server.verify_jwt_token('a')
+        self.assertEqual(self.wm.verify_jwt_token.call_count, 1)
+        with patch.object(server, '_time', return_value=1000.0 + server._JWT_CACHE_TTL):
+            self.server.verify_jwt_token('a')
+        self.assertEqual(self.wm.verify_jwt_token.call_count, 2)
+
+    def test_entry_expires_with_token(self):
+        """A token expiring before the TTL is not served past its exp"""
+        self.wm.verify_jwt_token.side_effect = lambda token: {'user_id': token, 'exp': 1005}
+        with patch.object(server, '_time', return_value=1000.0):
+            self.server.verify_jwt_token('a')
+        with patch.object(server, '_time', return_value=1005.0):
+            self.server.verify_jwt_token('a')
+        self.assertEqual(self.wm.verify_jwt_token.call_count, 2)
+
+    def test_invalid_token_not_cached(self):
+        """Failed verifications are not cached"""
+        self.wm.verify_jwt_token.side_effect = None
+        self.wm.verify_jwt_token.return_value = None
+        self.assertIsNone(self.server.verify_jwt_token('bad'))
+        self.assertEqual(len(self.server._jwt_cache), 0)
+
+    def test_lru_size_bound(self):
+        """The cache never exceeds _JWT_CACHE_MAX and evicts the least recently used token"""
+        with patch.object(server, '_JWT_CACHE_MAX', 3):
+            for token in ('a', 'b', 'c'):
+                self.server.verify_jwt_token(token)
+            self.server.verify_jwt_token('a')  # refresh 'a'
+            self.server.verify_jwt_token('d')  # evicts 'b'
+            self.assertEqual(len(self.server._jwt_cache), 3)
+            self.wm.verify_jwt_token.reset_mock()
+            self.server.verify_jwt_token('a')
+            self.assertEqual(self.wm.verify_jwt_token.call_count, 0)
+            self.server.verify_jwt_token('b')
+            self.assertEqual(self.wm.verify_jwt_token.call_count, 1)
+
+    def test_invalidation_during_verification_is_not_cached(self):
+        """A verification that races an invalidation does not repopulate the cache"""
+        def verify(token):
+            self.server.invalidate_jwt_token(token)
+            return {'user_id': token, 'exp': 10 ** 10}
+        self.wm.verify_jwt_token.side_effect = verify
+        self.server.verify_jwt_token('a')
+        self.assertEqual(len(self.server._jwt_cache), 0)
+
+
+class TestLogout(unittest.TestCase):
+    """Test that logout drops the token from the verification cache"""
+
+    def setUp(self):
+        self.wm = Mock()
+        self.wm.verify_jwt_token.side_effect = lambda token: {'user_id': 'u', 'exp': 10 ** 10}
+        self.wm.logout.return_value = {'success': True}
+        self.server = make_server(self.wm)
+        self.handler = PiMonitorHandler.__new__(PiMonitorHandler)
+        self.handler.server_instance = self.server
+        self.handler.headers = {'Authorization': 'Bearer tok'}
+        self.handler._write_response = Mock()
+
+    def test_logout_invalidates_cached_token(self):
+        """After logout the token is verified against the session store again"""
+        self.server.verify_jwt_token('tok')
+        self.handler._handle_logout()
+        self.wm.logout.assert_called_once_with('tok')
+        self.assertEqual(len(self.server._jwt_cache), 0)
+
+        self.wm.verify_jwt_token.side_effect = None
+        self.wm.verify_jwt_token.return_value = None
+        self.assertIsNone(self.server.verify_jwt_token('tok'))
+
+    def test_token_cached_during_logout_is_dropped(self):
+        """A request verified while logout is running does not keep the token cached"""
+        def logout(token):
+            self.server.verify_jwt_token(token)
+            return {'success': True}
+        self.wm.logout.side_effect = logout
+        self.handler._handle_logout()
+        self.assertEqual(len(self.server._jwt_cache), 0)
+
+
+class TestPostBody(unittest.TestCase):
+    """Test request body handling in do_POST"""
+
+    def make_handler(self, path, body, content_length=None):
+        handler = PiMonitorHandler.__new__(PiMonitorHandler)
+        handler.server_instance = make_server(None)
+        handler.path = path
+        handler.headers = {'Content-Length': str(len(body) if content_length is None else content_length)}
+        handler.rfile = io.BytesIO(body)
+        handler.close_connection = False
+        handler._write_response = Mock()
+        return handler
+
+    def test_oversized_body_rejected_unread(self):
+        """Bodies above _MAX_POST_BODY get 413 and the connection is closed"""
+        handler = self.make_handler('/api/auth/token', b'x', content_length=server._MAX_POST_BODY + 1)
+        handler._route_post = Mock()
+        handler.do_POST()
+        handler._route_post.assert_not_called()
+        self.assertEqual(handler._write_response.call_args[0][0], 413)
+        self.assertTrue(handler.close_connection)
+        self.assertEqual(handler.rfile.tell(), 0)
+
+    def test_unread_body_closes_connection(self):
+        """A request rejected without reading its body is not kept alive"""
+        handler = self.make_handler('/does-not-exist', b'{"a": 1}')
+        handler._handle_404 = Mock()
+        handler.do_POST()
+        handler._handle_404.assert_called_once_with()
+        self.assertTrue(handler.close_connection)
+        self.assertEqual(handler.rfile.tell(), 0)
+
+    def test_read_body_keeps_connection(self):
+        """Handlers read exactly Content-Length bytes and the connection stays open"""
+        handler = self.make_handler('/api/test', b'{"a": 1}NEXT')
+        handler.headers['Content-Length'] = '8'
+        bodies = []
+        handler._route_post = lambda: bodies.append(handler.rfile.read(1000))
+        handler.do_POST()
+        self.assertEqual(bodies, [b'{"a": 1}'])
+        self.assertFalse(handler.close_connection)
+        self.assertEqual(handler.rfile.read(), b'NEXT')
+
+
+class TestInternalError(unittest.TestCase):
+    """Test the 500 response helpers"""
+
+    def setUp(self):
+        self.handler = PiMonitorHandler.__new__(PiMonitorHandler)
+        self.handler._write_response = Mock()
+
+    def sent(self):
+        status, body = self.handler._write_response.call_args[0]
+        return status, json.loads(body)
+
+    def test_message(self):
+        self.handler._send_internal_error('Failed to clear metrics: disk "full"')
+        self.assertEqual(self.sent(), (500, {'error': 'Failed to clear metrics: disk "full"'}))
+
+    def test_prefix_with_exception(self):
+        """The exception text is escaped into the pre-encoded prefix"""
+        self.handler._send_internal_error_exc(server._ERR_LOGOUT, ValueError('bad "token"\n\\'))
+        self.assertEqual(self.sent(), (500, {'error': 'Logout failed: bad "token"\n\\'}))
+
+
+class TestResponseCacheKey(unittest.TestCase):
+    """Test how _write_cached keys the response cache"""
+
+    def setUp(self):
+        self.server = make_server(None)
+        self.server.response_cache = ResponseCache()
+
+    def get(self, path, build, params=()):
+        return json.loads(self.request(path, build, params)[1])
+
+    def request(self, path, build, params=()):
+        """Positional args passed to _write_response"""
+        handler = PiMonitorHandler.__new__(PiMonitorHandler)
+        handler.server_instance = self.server
+        handler.path = path
+        handler._write_response = Mock()
+        handler._write_cached(60, build, params)
+        return handler._write_response.call_args[0]
+
+    def test_cache_buster_ignored(self):
+        """Requests differing only in _ts share one build"""
+        build = Mock(return_value={'cpu': 1})
+        self.assertEqual(self.get('/api/system?_ts=1700000000001', build), {'cpu': 1})
+        self.assertEqual(self.get('/api/system?_ts=1700000000002', build), {'cpu': 1})
+        self.assertEqual(self.get('/api/system', build), {'cpu': 1})
+        build.assert_called_once_with()
+        self.assertEqual(len(self.server.response_cache._entries), 1)
+
+    def test_params_split_entries(self):
+        """Parameters passed by the handler are part of the key"""
+        build = Mock(side_effect=lambda: {'n': build.call_count})
+        self.get('/api/system?history=5&_ts=1', build, (('history', 5),))
+        self.get('/api/system?_ts=2&history=5', build, (('history', 5),))
+        self.get('/api/system?history=60&_ts=3', build, (('history', 60),))
+        self.assertEqual(build.call_count, 2)
+
+    def test_paths_split_entries(self):
+        build = Mock(return_value={})
+        self.get('/api/system?_ts=1', build)
+        self.get('/api/system/enhanced?_ts=1', build)
+        self.assertEqual(build.call_count, 2)
+
+    def test_stale_response_has_warning(self):
+        """A stale fallback is served with Warning: 110"""
+        self.request('/api/system', lambda: {'cpu': 1})
+        with patch('utils.time.monotonic', return_value=10 ** 9):
+            status, body, _, extra_headers = self.request('/api/system', Mock(side_effect=OSError('boom')))
+        self.assertEqual((status, json.loads(body)), (200, {'cpu': 1}))
+        self.assertEqual(extra_headers, server._STALE_WARNING)
+
+    def test_build_failure_without_cached_value(self):
+        """With nothing cached a failing build answers 500 instead of raising"""
+        status, body = self.request('/api/system', Mock(side_effect=OSError('boom')))
+        self.assertEqual((status, json.loads(body)), (500, {'error': 'Failed to build response: boom'}))
+        self.assertEqual(len(self.server.response_cache._entries), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
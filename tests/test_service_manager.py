@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Pi Monitor - Service Manager tests
+systemctl output parsing, the text fallback used without JSON table output
+and batch service actions
+"""
+
+import io
+import os
+import sys
+import json
+import subprocess
+import stat
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import service_manager
+from service_manager import (
+    ServiceManager,
+    _iter_show_blocks,
+    _json_rows,
+    _parse_list_units_text,
+    _parse_systemctl_show,
+    _parse_unit_files_text,
+)
+
+# Captured from systemd 252 on Raspberry Pi OS (bookworm)
+
+# systemctl list-units --type=service --all --no-legend --no-pager --plain
+LIST_UNITS_PLAIN = """\
+cron.service                         loaded    active   running Regular background program processing daemon
+nginx.service                        loaded    failed   failed  A high performance web server and a reverse proxy server
+ssh.service                          loaded    active   running OpenBSD Secure Shell server
+systemd-fsck@dev-mmcblk0p1.service   loaded    active   exited  File System Check on /dev/mmcblk0p1
+"""
+
+# Same listing without --plain: failed and missing units carry a '●' marker column
+LIST_UNITS_MARKER = """\
+  cron.service                         loaded    active   running Regular background program processing daemon
+● nginx.service                        loaded    failed   failed  A high performance web server and a reverse proxy server
+● pigpiod.service                      not-found inactive dead    pigpiod.service
+  ssh.service                          loaded    active   running OpenBSD Secure Shell server
+"""
+
+# systemctl list-unit-files --type=service --no-legend --no-pager
+LIST_UNIT_FILES = """\
+cron.service                           enabled         enabled
+getty@.service                         enabled         enabled
+nginx.service                          disabled        enabled
+ssh.service                            enabled         enabled
+systemd-fsck@.service                  static          -
+"""
+
+# systemctl show --property=LoadState,ActiveState,UnitFileState,Description ssh nginx pigpiod
+SHOW_UNITS = """\
+LoadState=loaded
+ActiveState=active
+UnitFileState=enabled
+Description=OpenBSD Secure Shell server
+
+LoadState=loaded
+ActiveState=failed
+UnitFileState=disabled
+Description=A high performance web server and a reverse proxy server
+
+LoadState=not-found
+ActiveState=inactive
+UnitFileState=
+Description=pigpiod.service
+"""
+
+# Fake systemctl for an older systemd: 'show' takes no unit patterns, and the list
+# commands accept --output=json but still print their plain table
+FAKE_SYSTEMCTL = '''\
+import sys
+args = sys.argv[1:]
+if args[0] == 'show':
+    sys.exit(1)
+if args[0] == 'list-units':
+    sys.stdout.write({units!r})
+elif args[0] == 'list-unit-files':
+    sys.stdout.write({files!r})
+'''
+
+
+class TestShowParsing(unittest.TestCase):
+    """Test parsing of 'systemctl show' blocks"""
+
+    def test_blocks_in_request_order(self):
+        """One dict per unit, split on blank lines, including empty values"""
+        units = _parse_systemctl_show(SHOW_UNITS)
+        self.assertEqual([u['ActiveState'] for u in units], ['active', 'failed', 'inactive'])
+        self.assertEqual(units[2]['UnitFileState'], '')
+        self.assertEqual(units[2]['LoadState'], 'not-found')
+
+    def test_value_containing_equals(self):
+        """Only the first '=' separates key and value"""
+        units = list(_iter_show_blocks(['Id=a.service\n', 'Description=x=y\n']))
+        self.assertEqual(units, [{'Id': 'a.service', 'Description': 'x=y'}])
+
+    def test_streamed_lines_without_trailing_blank(self):
+        """Newline-terminated lines from a pipe parse the same as splitlines() output"""
+        lines = SHOW_UNITS.rstrip('\n').splitlines(keepends=True)
+        self.assertEqual(list(_iter_show_blocks(lines)), _parse_systemctl_show(SHOW_UNITS))
+
+    def test_empty_output(self):
+        self.assertEqual(_parse_systemctl_show(''), [])
+
+
+class TestListUnitsText(unittest.TestCase):
+    """Test the plain-text list-units / list-unit-files parsers"""
+
+    def test_plain_columns(self):
+        """Descriptions keep their inner spaces; template instances are kept"""
+        rows = _parse_list_units_text(LIST_UNITS_PLAIN)
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0], {
+            'unit': 'cron.service', 'load': 'loaded', 'active': 'active', 'sub': 'running',
+            'description': 'Regular background program processing daemon',
+        })
+        self.assertEqual(rows[3]['unit'], 'systemd-fsck@dev-mmcblk0p1.service')
+        self.assertEqual(rows[3]['sub'], 'exited')
+
+    def test_failed_unit_marker(self):
+        """The '●' marker column is skipped for failed and not-found units"""
+        rows = _parse_list_units_text(LIST_UNITS_MARKER)
+        self.assertEqual([r['unit'] for r in rows],
+                         ['cron.service', 'nginx.service', 'pigpiod.service', 'ssh.service'])
+        nginx = rows[1]
+        self.assertEqual((nginx['load'], nginx['active'], nginx['sub']), ('loaded', 'failed', 'failed'))
+        self.assertEqual(nginx['description'], 'A high performance web server and a reverse proxy server')
+        self.assertEqual(rows[2]['load'], 'not-found')
+
+    def test_non_service_lines_ignored(self):
+        """Legend, summary and truncated lines are not taken as units"""
+        output = ('UNIT LOAD ACTIVE SUB DESCRIPTION\n' + LIST_UNITS_PLAIN
+                  + '\n4 loaded units listed.\nbroken.service loaded\n')
+        self.assertEqual(len(_parse_list_units_text(output)), 4)
+
+    def test_unit_files(self):
+        rows = _parse_unit_files_text(LIST_UNIT_FILES)
+        self.assertEqual(rows[0], {'unit_file': 'cron.service', 'state': 'enabled'})
+        self.assertEqual([r['state'] for r in rows], ['enabled', 'enabled', 'disabled', 'enabled', 'static'])
+
+
+class TestJSONRows(unittest.TestCase):
+    """Test detection of systemctl --output=json support"""
+
+    def test_json_table(self):
+        output = b'[{"unit":"ssh.service","load":"loaded","active":"active","sub":"running","description":"x"}]'
+        self.assertEqual(_json_rows(0, output)[0]['unit'], 'ssh.service')
+
+    def test_plain_table_instead_of_json(self):
+        """Older systemd ignores --output=json for list commands and prints the text table"""
+        self.assertIsNone(_json_rows(0, LIST_UNITS_PLAIN.encode()))
+
+    def test_failed_command(self):
+        self.assertIsNone(_json_rows(1, b"Unknown output 'json'.\n"))
+
+    def test_non_list_json(self):
+        self.assertIsNone(_json_rows(0, b'{"unit": "ssh.service"}'))
+
+
+@unittest.skipUnless(os.name == 'posix', 'fake systemctl is an executable script')
+class TestTextFallback(unittest.TestCase):
+    """End-to-end listing against a systemctl without show patterns or JSON output"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.systemctl = os.path.join(self.temp_dir.name, 'systemctl')
+        with open(self.systemctl, 'w') as f:
+            f.write(f'#!{sys.executable}\n' + FAKE_SYSTEMCTL.format(units=LIST_UNITS_MARKER, files=LIST_UNIT_FILES))
+        os.chmod(self.systemctl, os.stat(self.systemctl).st_mode | stat.S_IEXEC)
+
+        self.dbus_patcher = patch.object(service_manager, 'DBus', None)
+        self.dbus_patcher.start()
+        self.manager = ServiceManager()
+        self.manager._systemctl_path = self.systemctl
+
+    def tearDown(self):
+        self.dbus_patcher.stop()
+        self.temp_dir.cleanup()
+
+    def test_services_from_text_tables(self):
+        """Running services come first, and enabled state comes from list-unit-files"""
+        services = self.manager._list_systemd_services()
+        self.assertEqual([s['name'] for s in services], ['cron', 'ssh', 'nginx', 'pigpiod'])
+        by_name = {s['name']: s for s in services}
+        self.assertTrue(by_name['ssh']['active'])
+        self.assertTrue(by_name['ssh']['enabled'])
+        self.assertEqual(by_name['nginx']['status'], 'failed')
+        self.assertFalse(by_name['nginx']['enabled'])
+        self.assertFalse(by_name['pigpiod']['enabled'])
+
+
+class TestBatchServiceAction(unittest.TestCase):
+    """Test POST /api/services with a service_names list"""
+
+    def setUp(self):
+        self.manager = ServiceManager()
+        self.manager._systemctl_path = '/usr/bin/systemctl'
+        self.manager._sudo_path = None
+        self.manager._tools_resolved_at = float('inf')  # keep the paths above
+        self.calls = []
+
+    def post(self, body):
+        handler = Mock()
+        data = json.dumps(body).encode()
+        handler.headers = {'Content-Length': str(len(data))}
+        handler.rfile = io.BytesIO(data)
+        return self.manager.handle_service_action(handler)
+
+    def fake_run(self, action_rc=0, stderr='', states=''):
+        def run(cmd, **kwargs):
+            self.calls.append(cmd)
+            if cmd[1] == 'is-active':
+                return subprocess.CompletedProcess(cmd, 3, stdout=states)
+            return subprocess.CompletedProcess(cmd, action_rc, stderr=stderr)
+        return patch.object(service_manager.subprocess, 'run', side_effect=run)
+
+    def test_all_succeed(self):
+        """One systemctl call covers every unit"""
+        with self.fake_run():
+            result = self.post({'service_names': ['ssh', 'nginx'], 'action': 'restart'})
+        self.assertTrue(result['success'])
+        self.assertEqual(result['results'], [{'name': 'ssh', 'ok': True}, {'name': 'nginx', 'ok': True}])
+        self.assertEqual(self.calls, [['/usr/bin/systemctl', 'restart', '--', 'ssh', 'nginx']])
+
+    def test_mixed_success_and_failure(self):
+        """When the call fails, per-unit results come from is-active"""
+        stderr = 'Job for nginx.service failed because the control process exited with error code.'
+        with self.fake_run(action_rc=1, stderr=stderr, states='active\nfailed\n'):
+            result = self.post({'service_names': ['ssh', 'nginx'], 'action': 'start'})
+        self.assertFalse(result['success'])
+        self.assertEqual(result['results'], [{'name': 'ssh', 'ok': True}, {'name': 'nginx', 'ok': False}])
+        self.assertIn(stderr, result['message'])
+        self.assertEqual(self.calls[1], ['/usr/bin/systemctl', 'is-active', '--', 'ssh', 'nginx'])
+
+    def test_mixed_stop(self):
+        """For stop, a unit that is no longer active counts as done"""
+        with self.fake_run(action_rc=1, states='inactive\nactive\n'):
+            result = self.post({'service_names': ['ssh', 'nginx'], 'action': 'stop'})
+        self.assertEqual(result['results'], [{'name': 'ssh', 'ok': True}, {'name': 'nginx', 'ok': False}])
+
+    def test_empty_or_invalid_names(self):
+        """Empty lists, non-lists and non-string names are rejected without running anything"""
+        with self.fake_run():
+            for names in ([], 'ssh', ['ssh', ''], ['ssh', 5], {'ssh': True}):
+                result = self.post({'service_names': names, 'action': 'start'})
+                self.assertFalse(result['success'], names)
+                self.assertIn('service_names', result['message'])
+        self.assertEqual(self.calls, [])
+
+    def test_unknown_action(self):
+        with self.fake_run():
+            result = self.post({'service_names': ['ssh'], 'action': 'enable'})
+        self.assertFalse(result['success'])
+        self.assertEqual(self.calls, [])
+
+
+class TestRestartService(unittest.TestCase):
+    """Test restart_service's report of attempted methods"""
+
+    def setUp(self):
+        self.manager = ServiceManager()
+        self.manager._tools_resolved_at = float('inf')  # keep the paths set by each test
+
+    def restart(self, systemctl=None, service=None, docker=None):
+        self.manager._systemctl_path = systemctl
+        self.manager._service_path = service
+        self.manager._docker_path = docker
+        failed = subprocess.CompletedProcess([], 1, stdout='', stderr='Unit pi-monitor.service not found.')
+        with patch.object(service_manager.subprocess, 'run', return_value=failed) as run:
+            return self.manager.restart_service(), run
+
+    def test_only_available_methods_reported(self):
+        result, run = self.restart(systemctl='/usr/bin/systemctl', docker='/usr/bin/docker')
+        self.assertFalse(result['success'])
+        self.assertEqual(result['methods_tried'], ['systemctl', 'docker'])
+        self.assertEqual([call.args[0][0] for call in run.call_args_list], ['/usr/bin/systemctl', '/usr/bin/docker'])
+
+    def test_no_methods_available(self):
+        result, run = self.restart()
+        self.assertFalse(result['success'])
+        self.assertEqual(result['methods_tried'], [])
+        run.assert_not_called()
+
+
+class TestManageStatus(unittest.TestCase):
+    """Test that the D-Bus and systemctl status paths report the same values"""
+
+    def status(self, dbus_state=None, is_active=(3, 'inactive\n')):
+        manager = ServiceManager()
+        handler = Mock()
+        handler.headers = {}
+        detailed = Mock(returncode=0)
+        detailed.communicate.return_value = ('pi-monitor.service', '')
+        returncode, stdout = is_active
+        with patch.object(service_manager, 'DBus', Mock() if dbus_state else None), \
+                patch.object(manager, '_systemd_call', return_value=[{'ActiveState': dbus_state}]), \
+                patch.object(service_manager.subprocess, 'Popen', return_value=detailed), \
+                patch.object(service_manager.subprocess, 'run',
+                             return_value=subprocess.CompletedProcess([], returncode, stdout=stdout)):
+            return manager.manage_service(handler)['status']
+
+    def test_active(self):
+        self.assertEqual(self.status(dbus_state='active'), 'active')
+        self.assertEqual(self.status(is_active=(0, 'active\n')), 'active')
+
+    def test_not_active_is_unknown(self):
+        for state in ('inactive', 'failed', 'activating'):
+            self.assertEqual(self.status(dbus_state=state), 'unknown')
+        self.assertEqual(self.status(is_active=(3, 'failed\n')), 'unknown')
+
+
+class TestEndpointInfo(unittest.TestCase):
+    """Test the static GET /api/service/restart and /api/service/manage bodies"""
+
+    def test_info_matches_encoded_body(self):
+        manager = ServiceManager()
+        self.assertEqual(manager.get_restart_info(), json.loads(service_manager.RESTART_INFO_JSON))
+        self.assertEqual(manager.get_manage_info(), json.loads(service_manager.MANAGE_INFO_JSON))
+
+    def test_callers_cannot_mutate_shared_info(self):
+        manager = ServiceManager()
+        info = manager.get_restart_info()
+        info['endpoint'] = 'changed'
+        info['available_methods'].clear()
+        fresh = manager.get_restart_info()
+        self.assertEqual(fresh['endpoint'], '/api/service/restart')
+        self.assertEqual(len(fresh['available_methods']), 3)
+        self.assertEqual(service_manager._RESTART_INFO['endpoint'], '/api/service/restart')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Pi Monitor - System Monitor tests
+Default gateway lookup from the kernel routing table
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from system_monitor import SystemMonitor
+
+ROUTE_HEADER = 'Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT\n'
+
+
+class TestDefaultGateway(unittest.TestCase):
+    """Test SystemMonitor._read_default_gateway against sample /proc/net/route tables"""
+
+    def read_gateway(self, *rows):
+        with tempfile.NamedTemporaryFile('w', suffix='.route', delete=False) as f:
+            f.write(ROUTE_HEADER + ''.join(row + '\n' for row in rows))
+        try:
+            return SystemMonitor._read_default_gateway(f.name)
+        finally:
+            os.unlink(f.name)
+
+    def test_little_endian_address(self):
+        """Gateway is decoded from host-order hex (0101A8C0 is 192.168.1.1)"""
+        gateway = self.read_gateway('wlan0\t00000000\t0101A8C0\t0003\t0\t0\t600\t00000000\t0\t0\t0')
+        self.assertEqual(gateway, '192.168.1.1')
+
+    def test_lowest_metric_wins(self):
+        """With several default routes the one with the lowest metric is used"""
+        gateway = self.read_gateway(
+            'wlan0\t00000000\t0101A8C0\t0003\t0\t0\t600\t00000000\t0\t0\t0',
+            'eth0\t00000000\t0100000A\t0003\t0\t0\t100\t00000000\t0\t0\t0',
+            'eth0\t0000000A\t00000000\t0001\t0\t0\t100\t00FFFFFF\t0\t0\t0',
+        )
+        self.assertEqual(gateway, '10.0.0.1')
+
+    def test_flags_must_be_up_and_gateway(self):
+        """Default routes that are down or have no gateway flag are skipped"""
+        gateway = self.read_gateway(
+            'eth0\t00000000\t0100000A\t0002\t0\t0\t0\t00000000\t0\t0\t0',
+            'eth1\t00000000\t0200000A\t0001\t0\t0\t0\t00000000\t0\t0\t0',
+            'wlan0\t00000000\t0101A8C0\t0003\t0\t0\t600\t00000000\t0\t0\t0',
+        )
+        self.assertEqual(gateway, '192.168.1.1')
+
+    def test_no_default_route(self):
+        """Tables without a usable default route return None"""
+        self.assertIsNone(self.read_gateway('eth0\t0000000A\t00000000\t0001\t0\t0\t100\t00FFFFFF\t0\t0\t0'))
+        self.assertIsNone(self.read_gateway())
+
+    def test_missing_table(self):
+        """An unreadable routing table returns None"""
+        self.assertIsNone(SystemMonitor._read_default_gateway('/nonexistent/route'))
+
+
+if __name__ == '__main__':
+    unittest.main()
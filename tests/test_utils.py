@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Pi Monitor - Utilities tests
+Rate limiting decorator and response cache
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import Mock, patch
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils import rate_limit, ResponseCache
+
+
+class Clock:
+    """Manually advanced stand-in for time.monotonic"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimit(unittest.TestCase):
+    """Test the per-IP token bucket in rate_limit"""
+
+    def setUp(self):
+        self.clock = Clock()
+        self.time_patcher = patch('utils.time.monotonic', self.clock)
+        self.time_patcher.start()
+
+    def tearDown(self):
+        self.time_patcher.stop()
+
+    def make_endpoint(self, **limits):
+        @rate_limit(**limits)
+        def endpoint(handler):
+            return 'ok'
+        return endpoint
+
+    def make_handler(self, ip='10.0.0.1'):
+        handler = Mock()
+        handler.client_address = (ip, 12345)
+        return handler
+
+    def call(self, endpoint, handler, times=1):
+        """Number of calls that got through"""
+        return sum(endpoint(handler) == 'ok' for _ in range(times))
+
+    def test_burst_limit(self):
+        """A new client can make max_requests calls at once, then gets 429"""
+        endpoint = self.make_endpoint(max_requests=5, window=60)
+        handler = self.make_handler()
+        self.assertEqual(self.call(endpoint, handler, 10), 5)
+        handler.send_response.assert_called_with(429)
+        handler.send_header.assert_any_call('Retry-After', '60')
+
+    def test_refill(self):
+        """Tokens come back at max_requests per window, capped at max_requests"""
+        endpoint = self.make_endpoint(max_requests=5, window=60)
+        handler = self.make_handler()
+        self.call(endpoint, handler, 5)
+        self.clock.now += 12  # one token
+        self.assertEqual(self.call(endpoint, handler, 3), 1)
+        self.clock.now += 3600  # refills to the burst limit, no further
+        self.assertEqual(self.call(endpoint, handler, 10), 5)
+
+    def test_per_ip_isolation(self):
+        """One client exhausting its bucket does not limit another"""
+        endpoint = self.make_endpoint(max_requests=3, window=60)
+        first, second = self.make_handler('10.0.0.1'), self.make_handler('10.0.0.2')
+        self.assertEqual(self.call(endpoint, first, 5), 3)
+        self.assertEqual(self.call(endpoint, second, 5), 3)
+
+    def test_idle_buckets_pruned(self):
+        """Beyond max_clients the least recently seen client's bucket is dropped"""
+        endpoint = self.make_endpoint(max_requests=1, window=60, max_clients=2)
+        a, b, c = (self.make_handler(ip) for ip in ('10.0.0.1', '10.0.0.2', '10.0.0.3'))
+        self.call(endpoint, a)
+        self.call(endpoint, b)
+        self.call(endpoint, c)  # evicts a, the least recently seen
+        # a starts over with a full bucket; c is still exhausted
+        self.assertEqual(self.call(endpoint, a), 1)
+        self.assertEqual(self.call(endpoint, c), 0)
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test TTL expiry, LFU eviction and stale fallback in ResponseCache"""
+
+    def setUp(self):
+        self.clock = Clock()
+        self.time_patcher = patch('utils.time.monotonic', self.clock)
+        self.time_patcher.start()
+        self.cache = ResponseCache(max_entries=3)
+
+    def tearDown(self):
+        self.time_patcher.stop()
+
+    def test_hit_within_ttl(self):
+        """A fresh entry is served without calling the builder"""
+        build = Mock(return_value=b'body')
+        self.assertEqual(self.cache.get_or_build('k', 5, build), (b'body', False))
+        self.assertEqual(self.cache.get_or_build('k', 5, build), (b'body', False))
+        build.assert_called_once_with()
+
+    def test_ttl_expiry(self):
+        """An entry is rebuilt once its TTL has passed"""
+        self.cache.get_or_build('k', 5, lambda: b'old')
+        self.clock.now += 4.9
+        self.assertEqual(self.cache.get_or_build('k', 5, lambda: b'new'), (b'old', False))
+        self.clock.now += 0.1
+        self.assertEqual(self.cache.get_or_build('k', 5, lambda: b'new'), (b'new', False))
+
+    def test_evicts_least_frequently_used(self):
+        """At capacity the entry with the fewest hits is evicted"""
+        for key, hits in (('a', 3), ('b', 1), ('c', 2)):
+            for _ in range(hits):
+                self.cache.get_or_build(key, 60, lambda: key.encode())
+        self.cache.get_or_build('d', 60, lambda: b'd')
+        self.assertEqual(set(self.cache._entries), {'a', 'c', 'd'})
+
+    def test_expired_entries_evicted_first(self):
+        """Expired entries are dropped before any live entry is evicted"""
+        for _ in range(5):
+            self.cache.get_or_build('hot', 1, lambda: b'hot')
+        self.cache.get_or_build('b', 60, lambda: b'b')
+        self.cache.get_or_build('c', 60, lambda: b'c')
+        self.clock.now += 2
+        self.cache.get_or_build('d', 60, lambda: b'd')
+        self.assertEqual(set(self.cache._entries), {'b', 'c', 'd'})
+
+    def test_expired_lookups_not_counted_as_hits(self):
+        """Only fresh hits count towards LFU, not stale or expired lookups"""
+        self.cache.get_or_build('a', 1, lambda: b'a')
+        self.clock.now += 2
+        for _ in range(3):
+            self.assertEqual(self.cache.get_or_build('a', 60, Mock(side_effect=RuntimeError('boom'))), (b'a', True))
+        self.cache.get_or_build('a', 60, lambda: b'a')
+        for key in ('b', 'c'):
+            for _ in range(2):
+                self.cache.get_or_build(key, 60, lambda: key.encode())
+        self.cache.get_or_build('d', 60, lambda: b'd')
+        self.assertEqual(set(self.cache._entries), {'b', 'c', 'd'})
+
+    def test_stale_copy_when_builder_raises(self):
+        """An expired value is served, marked stale, when rebuilding fails"""
+        self.cache.get_or_build('k', 5, lambda: b'old')
+        self.clock.now += 10
+        failing = Mock(side_effect=RuntimeError('boom'))
+        self.assertEqual(self.cache.get_or_build('k', 5, failing), (b'old', True))
+        # The stale value is not refreshed, so the next request tries again
+        self.assertEqual(self.cache.get_or_build('k', 5, lambda: b'new'), (b'new', False))
+
+    def test_builder_error_without_cached_value(self):
+        """With nothing cached the builder's exception propagates"""
+        with self.assertRaises(RuntimeError):
+            self.cache.get_or_build('k', 5, Mock(side_effect=RuntimeError('boom')))
+
+    def test_clear(self):
+        """clear() forces the next request to rebuild"""
+        self.cache.get_or_build('k', 60, lambda: b'old')
+        self.cache.clear()
+        self.assertEqual(self.cache.get_or_build('k', 60, lambda: b'new'), (b'new', False))
+
+
+if __name__ == '__main__':
+    unittest.main()